@@ -0,0 +1,50 @@
+"""Identicons drawn locally in place of Gravatar images.
+
+An identicon is drawn from a user's avatar hash, so a hash and a size always
+produce the same image and the pair addresses its content. Each one is
+written under AVATAR_ROOT the first time it is requested and only read from
+there afterwards.
+"""
+import os
+import tempfile
+from django.conf import settings
+
+GRID_SIZE = 5
+
+
+def identicon_svg(avatar_hash, size):
+    """Return a horizontally symmetric identicon of the avatar hash as SVG."""
+    digest = bytes.fromhex(avatar_hash)
+    hue = int.from_bytes(digest[-2:], 'big') * 360 // 65536
+    columns = (GRID_SIZE + 1) // 2
+    cells = []
+    for row in range(GRID_SIZE):
+        for column in range(columns):
+            bit = row * columns + column
+            if digest[bit // 8] >> (bit % 8) & 1:
+                for x in sorted({column, GRID_SIZE - 1 - column}):
+                    cells.append(f'<rect x="{2 * x + 1}" y="{2 * row + 1}" width="2" height="2"/>')
+    extent = 2 * GRID_SIZE + 2
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {extent} {extent}" shape-rendering="crispEdges">'
+        f'<rect width="{extent}" height="{extent}" fill="#f0f0f0"/>'
+        f'<g fill="hsl({hue}, 55%, 50%)">{"".join(cells)}</g></svg>'
+    )
+
+
+def identicon_path(avatar_hash, size):
+    """Return where the identicon of the avatar hash in the size is stored."""
+    return os.path.join(settings.AVATAR_ROOT, avatar_hash[:2], f'{avatar_hash}-{size}.svg')
+
+
+def store_identicon(avatar_hash, size):
+    """Draw the identicon and store it, returning its path."""
+    path = identicon_path(avatar_hash, size)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Written aside and moved into place so a concurrent request never reads half a file
+    with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as file:
+        file.write(identicon_svg(avatar_hash, size))
+    os.replace(file.name, path)
+    return path
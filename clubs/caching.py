@@ -0,0 +1,99 @@
+"""Versioned cache keys for data derived from clubs and their memberships.
+
+Every cached value is stored under a key that embeds the current version of
+the objects it was built from. Changing one of those objects only has to
+replace its version token; stale entries are never read again and simply
+expire. Tokens are random rather than counters so that an evicted version
+can never come back with a value that was used before. New versions are
+stored when the transaction that changed the objects commits.
+
+While a request is handled inside remembered_versions(), each version is
+read from the cache at most once.
+"""
+from contextlib import contextmanager
+from uuid import uuid4
+from asgiref.local import Local
+from django.core.cache import cache
+from django.db import transaction
+
+# The versions read by the request being handled, keyed by their cache keys
+_request = Local()
+
+
+def _version_key(namespace, object_id):
+    return f'clubs:version:{namespace}:{object_id}'
+
+
+@contextmanager
+def remembered_versions():
+    """Remember the versions read inside the block, so none is read from the cache twice."""
+    _request.versions = {}
+    try:
+        yield
+    finally:
+        del _request.versions
+
+
+def get_keyed_versions(pairs):
+    """Return the current version of each (namespace, object id) pair, creating missing ones.
+
+    Versions not yet remembered are read in one round trip.
+    """
+    remembered = getattr(_request, 'versions', {})
+    keys = {pair: _version_key(*pair) for pair in pairs}
+    found = {key: remembered[key] for key in keys.values() if key in remembered}
+    missing = [key for key in keys.values() if key not in found]
+    if missing:
+        found.update(cache.get_many(missing))
+        for key in missing:
+            if found.get(key) is None:
+                version = uuid4().hex
+                found[key] = version if cache.add(key, version, None) else cache.get(key, version)
+        if hasattr(_request, 'versions'):
+            _request.versions.update((key, found[key]) for key in missing)
+    return {pair: found[key] for pair, key in keys.items()}
+
+
+def get_version_string(*pairs):
+    """Return the current versions of the (namespace, object id) pairs joined into one key part."""
+    versions = get_keyed_versions(pairs)
+    return ':'.join(versions[pair] for pair in pairs)
+
+
+def get_versions(namespace, object_ids):
+    """Return the current version of each object, creating missing ones."""
+    versions = get_keyed_versions([(namespace, object_id) for object_id in object_ids])
+    return {object_id: versions[(namespace, object_id)] for object_id in object_ids}
+
+
+def get_version(namespace, object_id):
+    """Return the current version of an object."""
+    return get_versions(namespace, [object_id])[object_id]
+
+
+def invalidate(namespace, *object_ids):
+    """Give the objects new versions, orphaning everything cached from them."""
+    _replace_versions([(namespace, object_id) for object_id in object_ids])
+
+
+def invalidate_membership(user_ids, club_id):
+    """Invalidate cached data after the users' memberships of the club changed."""
+    _replace_versions([*(('user', user_id) for user_id in user_ids), ('club', club_id), ('table', 'member')])
+
+
+def _replace_versions(pairs):
+    """Store new versions of the (namespace, object id) pairs once the current transaction commits.
+
+    Replaced any earlier, a concurrent request could read the rows as last
+    committed and cache them under the new versions, where they would be
+    served until they expire.
+    """
+    versions = {_version_key(*pair): uuid4().hex for pair in pairs}
+    remembered = getattr(_request, 'versions', None)
+
+    def store_versions():
+        cache.set_many(versions, None)
+        if remembered is not None:
+            remembered.update(versions)
+
+    transaction.on_commit(store_versions)
@@ -0,0 +1,9 @@
+"""Context processors of the clubs app."""
+
+
+def myclubs(request):
+    """Make the requesting user's memberships available to the navbar."""
+    memberships = getattr(request, 'memberships', None)
+    if memberships is None:
+        return {}
+    return {'myclubs': memberships.myclubs}
@@ -1,7 +1,17 @@
+from hashlib import md5
 from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
 from django.shortcuts import redirect
 from django.core.exceptions import ObjectDoesNotExist
-from .models import User, Member, Club
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.template.response import TemplateResponse
+from django.utils.cache import patch_cache_control
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
+from .caching import get_version_string
+from .models import User, Club
 from .user_types import UserTypes
 import logging
 
@@ -28,67 +38,106 @@ def valid_user_required(view_function):
     return modified_view_function
 
 
-def club_owner_required(view_function):
-    """Must be an owner of the specified club"""
+def _club_role_required(view_function, allowed_user_types):
+    """Only let users whose type in the specified club is allowed through"""
     def modified_view_function(request, club_id, user_id=None):
-        try:
-            user = request.user
-            club = Club.objects.get(id=club_id)
-            member = Member.objects.get(current_user=user, club_membership=club)
-            if member.user_type == UserTypes.CLUB_OWNER:
-                if user_id:
-                    return view_function(request, club_id, user_id)
-                else:
-                    return view_function(request, club_id)
+        user_type = request.memberships.user_type(club_id)
+        if user_type is None:
+            if not Club.objects.filter(id=club_id).exists():
+                return redirect('feed')
+            return redirect('show_club', club_id)
+        if user_type in allowed_user_types:
+            if user_id:
+                return view_function(request, club_id, user_id)
             else:
-                return redirect('show_club', club_id)
-        except Club.DoesNotExist:
-            return redirect('feed')
-        except  Member.DoesNotExist:
+                return view_function(request, club_id)
+        else:
             return redirect('show_club', club_id)
-
     return modified_view_function
 
+def club_owner_required(view_function):
+    """Must be an owner of the specified club"""
+    return _club_role_required(view_function, (UserTypes.CLUB_OWNER,))
+
 def staff_required(view_function):
     """Must be an officer or owner of the specified club"""
-    def modified_view_function(request, club_id, user_id=None):
-        user = request.user
-        try:
-            club = Club.objects.get(id=club_id)
-            member = Member.objects.get(current_user=user, club_membership=club)
-            if member.user_type == UserTypes.CLUB_OWNER or member.user_type == UserTypes.OFFICER:
-                if user_id:
-                    return view_function(request, club_id, user_id)
-                else:
-                    return view_function(request, club_id)
-            else:
-                return redirect('show_club', club_id)
-        except Club.DoesNotExist:
-            return redirect('feed')
-        except  Member.DoesNotExist:
-            return redirect('show_club', club_id)
-    return modified_view_function
+    return _club_role_required(view_function, (UserTypes.CLUB_OWNER, UserTypes.OFFICER))
 
 def member_required(view_function):
     """Must be a member, officer or owner of the specified club"""
-    def modified_view_function(request, club_id, user_id=None):
-        user = request.user
-        try:
-            club = Club.objects.get(id=club_id)
-            member = Member.objects.get(current_user=user, club_membership=club)
-            if member.user_type == UserTypes.CLUB_OWNER or member.user_type == UserTypes.OFFICER or member.user_type == UserTypes.MEMBER:
-                if user_id:
-                    return view_function(request, club_id, user_id)
-                else:
-                    return view_function(request, club_id)
-            else:
-                return redirect('show_club', club_id)
-        except Club.DoesNotExist:
-            return redirect('feed')
-        except  Member.DoesNotExist:
-            return redirect('show_club', club_id)
-    return modified_view_function
+    return _club_role_required(view_function, (UserTypes.CLUB_OWNER, UserTypes.OFFICER, UserTypes.MEMBER))
+
+# Role tier of users with no membership of the club
+OUTSIDER = 0
+# Stands in for the CSRF token in cached content, which is shared by many sessions
+CSRF_TOKEN_PLACEHOLDER = '__clubs_csrf_token__'
+
+def role_tier_cached(page_template_name, content_template_name):
+    """Cache the content a club view renders once per role tier.
+
+    The view must return a TemplateResponse for page_template_name, which
+    shows `content` inside the site layout. The view's context is rendered
+    with content_template_name and cached under the club's versions and the
+    viewer's role tier, so every viewer of the same tier shares one render
+    and only the navbar and messages around it are rendered per request.
+    Requests with query parameters are rendered but not cached.
+    """
+    def decorator(view_function):
+        def modified_view_function(request, club_id, *args, **kwargs):
+            key = None
+            if not request.GET:
+                tier = request.memberships.user_type(club_id) or OUTSIDER
+                versions = get_version_string(('club', club_id), ('club_posts', club_id))
+                key = f'clubs:fragment:{view_function.__name__}:{club_id}:{versions}:{tier}'
+                content = cache.get(key)
+                if content is not None:
+                    return TemplateResponse(request, page_template_name, {'content': _with_csrf_token(request, content)})
+            response = view_function(request, club_id, *args, **kwargs)
+            if not isinstance(response, TemplateResponse) or response.status_code != 200:
+                return response
+            context = {**response.context_data, 'csrf_token': CSRF_TOKEN_PLACEHOLDER}
+            content = render_to_string(content_template_name, context, request)
+            if key is not None:
+                cache.set(key, content, settings.CLUB_FRAGMENT_TIMEOUT)
+            response.context_data['content'] = _with_csrf_token(request, content)
+            return response
+        return modified_view_function
+    return decorator
+
+def _with_csrf_token(request, content):
+    """Put the request's own CSRF token into cached content."""
+    if CSRF_TOKEN_PLACEHOLDER in content:
+        content = content.replace(CSRF_TOKEN_PLACEHOLDER, get_token(request))
+    return mark_safe(content)
+
+def conditional_page(page_versions):
+    """Answer conditional GETs of a page with 304 Not Modified while it is unchanged.
 
+    page_versions(request, *args, **kwargs) returns the (namespace, object id)
+    pairs whose cache versions cover everything the page shows besides the
+    viewer, and must be far cheaper than the view. The ETag combines their
+    versions, read with the viewer's own in one round trip, and the CSRF
+    token, so it changes whenever the rendered page would. Pages with
+    messages waiting to be shown get no ETag, as a 304 would not show them.
+    """
+    def etag(request, *args, **kwargs):
+        if not request.user.is_authenticated or len(get_messages(request)):
+            return None
+        user_id = request.user.id
+        parts = [
+            user_id,
+            get_version_string(('user', user_id), ('profile', user_id), *page_versions(request, *args, **kwargs)),
+            request.META.get('CSRF_COOKIE', ''),
+        ]
+        return md5(':'.join(map(str, parts)).encode()).hexdigest()
 
-#TODO retrieve get_users_clubs
-#TODO get user_type current user
+    def decorator(view_function):
+        conditional_view_function = condition(etag_func=etag)(view_function)
+        def modified_view_function(request, *args, **kwargs):
+            response = conditional_view_function(request, *args, **kwargs)
+            if response.has_header('ETag'):
+                # The page is the viewer's own, and must be revalidated before every reuse
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return modified_view_function
+    return decorator
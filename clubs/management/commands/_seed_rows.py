@@ -0,0 +1,117 @@
+"""Random rows for the seed command.
+
+Each shard of rows is generated from its own random seed, so a seeded
+dataset depends only on the seed and not on which process generated which
+shard. Nothing here touches Django, so worker processes need no setup.
+"""
+import itertools
+import math
+import random
+from typing import NamedTuple
+from faker import Faker
+
+
+class Scenario(NamedTuple):
+    """The shape of a seeded dataset."""
+
+    description: str
+    # Clubs are ranked by popularity, and the club of rank r draws members in proportion to 1 / r ** exponent
+    club_size_exponent: float
+    # Mean number of clubs each user is in or applying to, drawn from a geometric distribution
+    clubs_per_user: float
+    # Share of memberships that are officers, and that are applications
+    officer_share: float
+    applicant_share: float
+    # Share of the most popular clubs whose memberships are mostly applications awaiting a decision
+    backlog_club_share: float
+    backlog_applicant_share: float
+    # Posts are spread over the clubs by popularity, like members, with their own exponent
+    post_exponent: float
+
+
+SCENARIOS = {
+    'uniform': Scenario(
+        description='Each user is in one club chosen uniformly, as a member or an applicant; posts are spread evenly',
+        club_size_exponent=0, clubs_per_user=1, officer_share=0, applicant_share=0.5,
+        backlog_club_share=0, backlog_applicant_share=0, post_exponent=0,
+    ),
+    'production': Scenario(
+        description='Power-law club sizes, users in several clubs, a few clubs posting most, some application backlogs',
+        club_size_exponent=1.1, clubs_per_user=3, officer_share=0.02, applicant_share=0.1,
+        backlog_club_share=0.05, backlog_applicant_share=0.5, post_exponent=1.5,
+    ),
+    'tournament': Scenario(
+        description='A handful of huge clubs that post constantly, and a long tail of quiet ones',
+        club_size_exponent=1.6, clubs_per_user=2, officer_share=0.01, applicant_share=0.05,
+        backlog_club_share=0, backlog_applicant_share=0, post_exponent=2.5,
+    ),
+    'backlog': Scenario(
+        description='Popular clubs with long queues of applications to accept or decline',
+        club_size_exponent=1.1, clubs_per_user=2, officer_share=0.02, applicant_share=0.2,
+        backlog_club_share=0.2, backlog_applicant_share=0.8, post_exponent=1,
+    ),
+}
+
+
+def popularity_cum_weights(count, exponent):
+    """Return the cumulative weights of count ranks whose popularity falls off as 1 / rank ** exponent."""
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+def club_count(rng, mean):
+    """Return a number of clubs for a user, drawn from a geometric distribution with the mean."""
+    if mean <= 1:
+        return 1
+    return 1 + int(math.log(1 - rng.random()) / math.log(1 - 1 / mean))
+
+_faker = None
+
+
+def _shard_random(seed, kind, index):
+    """Return the random generator and Faker of the shard, both seeded for it."""
+    global _faker
+    if _faker is None:
+        _faker = Faker('en_GB')
+    rng = random.Random(f'{seed}:{kind}:{index}')
+    _faker.seed_instance(rng.getrandbits(64))
+    return rng, _faker
+
+
+def user_rows(seed, index, first_number, count):
+    """Return (email, first name, last name, bio, chess experience, personal statement) of each user of the shard."""
+    rng, faker = _shard_random(seed, 'users', index)
+    rows = []
+    for number in range(first_number, first_number + count):
+        first_name = faker.first_name()
+        last_name = faker.last_name()
+        rows.append((
+            f'{first_name}.{last_name}.{number}@example.org',
+            first_name,
+            last_name,
+            faker.text(max_nb_chars=520),
+            faker.random_int(0, 3000),
+            faker.text(max_nb_chars=10000),
+        ))
+    return rows
+
+
+def club_rows(seed, index, first_number, count):
+    """Return (name, location, description) of each club of the shard."""
+    rng, faker = _shard_random(seed, 'clubs', index)
+    return [
+        (f'{faker.domain_word()}-{number}', faker.city(), faker.text(max_nb_chars=500))
+        for number in range(first_number, first_number + count)
+    ]
+
+
+def post_rows(seed, index, first_number, count, clubs, cum_weights):
+    """Return (club id, author id, message) of each post of the shard.
+
+    Posts are by the owner of a club drawn from (club id, owner id) pairs
+    with the cumulative weights.
+    """
+    rng, faker = _shard_random(seed, 'posts', index)
+    rows = []
+    for club_id, owner_id in rng.choices(clubs, cum_weights=cum_weights, k=count):
+        rows.append((club_id, owner_id, faker.text(max_nb_chars=520)))
+    return rows
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from clubs.models import TimelineEntry
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized feed timelines from the current posts and memberships'
+
+    def handle(self, *args, **options):
+        entry_count = TimelineEntry.rebuild()
+        print(f'Backfilled {entry_count} timeline entries')
@@ -0,0 +1,216 @@
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+from clubs.models import Club, Member, Post, User
+from clubs.user_types import UserTypes
+
+# Weighted actions, each a list of (URL name, acting user, method, URL arguments, POST data) requests made
+# in a row. Users are named by their role in the benchmarked club; actions that change memberships
+# change them back before they end, so any number of them can be replayed.
+ACTIONS = [
+    (20, [('feed', 'member', 'get', {}, None)]),
+    (5, [('post_updates', 'member', 'get', {}, {'after': 'latest_post'})]),
+    (10, [('show_club', 'member', 'get', {'club_id': 'club'}, None)]),
+    (8, [('club_members', 'member', 'get', {'club_id': 'club'}, None)]),
+    (2, [('club_member', 'member', 'get', {'club_id': 'club', 'user_id': 'owner'}, None)]),
+    (3, [('show_user', 'member', 'get', {'user_id': 'owner'}, None)]),
+    (1, [('show_applicant', 'officer', 'get', {'user_id': 'applicant'}, None)]),
+    (5, [('member_list', 'member', 'get', {}, None)]),
+    (5, [('club_list', 'member', 'get', {}, None)]),
+    (5, [('apply', 'member', 'get', {}, None)]),
+    (3, [('avatar', 'member', 'get', {'avatar_hash': 'owner_avatar', 'size': 60}, None)]),
+    (2, [('manage_applicants', 'officer', 'get', {'club_id': 'club'}, None)]),
+    (2, [('manage_officers', 'owner', 'get', {'club_id': 'club'}, None)]),
+    (1, [('edit_club', 'owner', 'get', {'club_id': 'club'}, None)]),
+    (1, [('edit_profile', 'member', 'get', {}, None)]),
+    (1, [('password', 'member', 'get', {}, None)]),
+    (1, [('create_club', 'member', 'get', {}, None)]),
+    (1, [('home', None, 'get', {}, None)]),
+    (1, [('log_in', None, 'get', {}, None)]),
+    (1, [('sign_up', None, 'get', {}, None)]),
+    (2, [('post_messages', 'owner', 'post', {'club_id': 'club'}, {'message': 'Benchmark post'})]),
+    (2, [
+        ('promote_member', 'owner', 'get', {'club_id': 'club', 'user_id': 'promoted'}, None),
+        ('demote_officer', 'owner', 'get', {'club_id': 'club', 'user_id': 'promoted'}, None),
+    ]),
+    (2, [
+        ('accept_application', 'officer', 'get', {'club_id': 'club', 'user_id': 'accepted'}, None),
+        ('kickout_member', 'owner', 'get', {'club_id': 'club', 'user_id': 'accepted'}, None),
+        ('apply_club', 'accepted', 'get', {'club_id': 'club'}, None),
+    ]),
+    (2, [
+        ('decline_application', 'officer', 'get', {'club_id': 'club', 'user_id': 'declined'}, None),
+        ('apply_club', 'declined', 'get', {'club_id': 'club'}, None),
+    ]),
+    (1, [
+        ('make_owner', 'owner', 'get', {'club_id': 'club', 'user_id': 'officer'}, None),
+        ('make_owner', 'officer', 'get', {'club_id': 'club', 'user_id': 'owner'}, None),
+    ]),
+]
+
+PERCENTILES = (50, 95, 99)
+
+
+class Command(BaseCommand):
+    help = 'Replay a weighted mix of requests to the views in the URL conf and report their latency and queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Number of weighted actions to replay')
+        parser.add_argument('--warmup', type=int, default=50, help='Number of actions replayed first and not measured')
+        parser.add_argument('--json', metavar='PATH', help='Also write the results as JSON to the file')
+        parser.add_argument('--reseed', action='store_true', help='Replace the data with a new dataset first')
+        parser.add_argument('--users', type=int, default=2000, help='Number of users when seeding')
+        parser.add_argument('--clubs', type=int, default=50, help='Number of clubs when seeding')
+        parser.add_argument('--posts', type=int, default=5000, help='Number of posts when seeding')
+        parser.add_argument('--scenario', default='production', help='Seed scenario when seeding')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the dataset and of the request mix')
+        parser.add_argument('--workers', type=int, default=1, help='Number of seed worker processes')
+
+    def handle(self, *args, **options):
+        if options['reseed']:
+            call_command('unseed', fast=True)
+        club = self.bench_club()
+        if club is None:
+            call_command(
+                'seed', users=options['users'], clubs=options['clubs'], posts=options['posts'],
+                scenario=options['scenario'], seed=options['seed'], workers=options['workers'],
+            )
+            club = self.bench_club()
+        if club is None:
+            raise CommandError('No club has the officer, members and applicants to benchmark, seed more users')
+        self.names = self.bench_names(club)
+        self.clients = {}
+        rng = random.Random(options['seed'])
+        weights = [weight for weight, _ in ACTIONS]
+
+        for _, requests in rng.choices(ACTIONS, weights=weights, k=options['warmup']):
+            self.replay(requests)
+        results = defaultdict(list)
+        started = time.perf_counter()
+        for _, requests in rng.choices(ACTIONS, weights=weights, k=options['requests']):
+            for url_name, result in self.replay(requests):
+                results[url_name].append(result)
+        elapsed = time.perf_counter() - started
+
+        report = self.report(results, elapsed, club)
+        self.print_report(report)
+        if options['json']:
+            with open(options['json'], 'w') as file:
+                json.dump(report, file, indent=2)
+
+    def bench_club(self):
+        """Return the biggest club with an officer and enough members and applicants to act on"""
+        return Club.objects.filter(
+            owner_count=1, officer_count__gte=1, member_count__gte=2, applicant_count__gte=3
+        ).order_by('-member_count').first()
+
+    def bench_names(self, club):
+        """Return the users and objects that requests refer to by name"""
+        def user_ids(user_type, count):
+            members = Member.objects.filter(club_membership=club, user_type=user_type).order_by('id')
+            return list(members.values_list('current_user_id', flat=True)[:count])
+
+        owner, = user_ids(UserTypes.CLUB_OWNER, 1)
+        officer, = user_ids(UserTypes.OFFICER, 1)
+        member, promoted = user_ids(UserTypes.MEMBER, 2)
+        applicant, accepted, declined = user_ids(UserTypes.APPLICANT, 3)
+        return {
+            'club': club.id, 'owner': owner, 'officer': officer, 'member': member, 'promoted': promoted,
+            'applicant': applicant, 'accepted': accepted, 'declined': declined,
+            'owner_avatar': User.objects.get(id=owner).avatar_hash,
+        }
+
+    def replay(self, requests):
+        """Make the requests in order, returning the URL name and result of each"""
+        results = []
+        for url_name, actor, method, kwargs, data in requests:
+            url = reverse(url_name, kwargs={key: self.names.get(value, value) for key, value in kwargs.items()})
+            if data is not None:
+                data = {key: self._value(value) for key, value in data.items()}
+            client = self.client(actor)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, data)
+                latency = time.perf_counter() - started
+            if response.status_code >= 400:
+                raise CommandError(f'{method.upper()} {url} as {actor or "a visitor"} failed with status {response.status_code}')
+            results.append((url_name, (latency, len(queries))))
+        return results
+
+    def client(self, actor):
+        """Return the client of the named user, logged in, or of a visitor"""
+        if actor not in self.clients:
+            client = Client(HTTP_HOST='127.0.0.1')
+            if actor is not None:
+                client.force_login(User.objects.get(id=self.names[actor]))
+            self.clients[actor] = client
+        return self.clients[actor]
+
+    def _value(self, value):
+        if value == 'latest_post':
+            return Post.objects.filter(club_own_id=self.names['club']).order_by('-id').values_list('id', flat=True).first() or 0
+        return value
+
+    def report(self, results, elapsed, club):
+        """Return the latency percentiles, queries and throughput of each URL name"""
+        views = {}
+        for url_name, measurements in sorted(results.items()):
+            latencies = sorted(latency for latency, _ in measurements)
+            views[url_name] = {
+                'requests': len(measurements),
+                **{f'p{percentile}_ms': round(_percentile(latencies, percentile) * 1000, 3) for percentile in PERCENTILES},
+                'queries': round(sum(queries for _, queries in measurements) / len(measurements), 2),
+                'requests_per_second': round(len(latencies) / sum(latencies), 1),
+            }
+        request_count = sum(view['requests'] for view in views.values())
+        return {
+            'commit': _commit(),
+            'dataset': {
+                'users': User.objects.count(), 'clubs': Club.objects.count(), 'posts': Post.objects.count(),
+                'members': Member.objects.count(), 'bench_club_members': club.members_count(),
+            },
+            'requests': request_count,
+            'requests_per_second': round(request_count / elapsed, 1),
+            'views': views,
+            'not_benchmarked': sorted(_url_names() - {url_name for _, requests in ACTIONS for url_name, *_ in requests}),
+        }
+
+    def print_report(self, report):
+        dataset = ', '.join(f'{count} {name.replace("_", " ")}' for name, count in report['dataset'].items())
+        print(f'Dataset: {dataset}')
+        print(f'{"URL name":<22}{"requests":>9}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"queries":>9}{"req/s":>9}')
+        for url_name, view in report['views'].items():
+            print(
+                f'{url_name:<22}{view["requests"]:>9}{view["p50_ms"]:>9.1f}{view["p95_ms"]:>9.1f}'
+                f'{view["p99_ms"]:>9.1f}{view["queries"]:>9.1f}{view["requests_per_second"]:>9.1f}'
+            )
+        print(f'{report["requests"]} requests at {report["requests_per_second"]} requests per second')
+        if report['not_benchmarked']:
+            print(f'Not benchmarked: {", ".join(report["not_benchmarked"])}')
+
+
+def _percentile(sorted_values, percentile):
+    """Return the nearest-rank percentile of the sorted values."""
+    rank = max(1, -(-len(sorted_values) * percentile // 100))
+    return sorted_values[rank - 1]
+
+
+def _url_names():
+    """Return the names of the views in the URL conf."""
+    return {pattern.name for pattern in get_resolver().url_patterns if isinstance(pattern, URLPattern) and pattern.name}
+
+
+def _commit():
+    """Return the checked out git commit, if there is one."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
@@ -0,0 +1,49 @@
+import timeit
+from unittest import mock
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.utils import timezone
+from libgravatar import Gravatar
+from clubs.models import Club, Post, User, gravatar_hash
+
+
+def libgravatar_url(user, size=120):
+    """Return the user's gravatar URL the way it was built before hashes were stored."""
+    return Gravatar(user.email).get_image(size=size, default='mp')
+
+
+class Command(BaseCommand):
+    help = 'Time rendering the rows of a feed page with gravatar URLs built by libgravatar and from stored hashes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100, help='Number of posts on the page')
+        parser.add_argument('--repeat', type=int, default=50, help='Number of times the page is rendered')
+
+    def handle(self, *args, **options):
+        posts = self._posts(options['posts'])
+        template = get_template('partials/post_as_table_row.html')
+
+        def render_page():
+            for post in posts:
+                template.render({'post': post})
+
+        with mock.patch.object(User, 'gravatar', libgravatar_url):
+            before = min(timeit.repeat(render_page, number=1, repeat=options['repeat']))
+        after = min(timeit.repeat(render_page, number=1, repeat=options['repeat']))
+
+        per_row = 1_000_000 / len(posts)
+        print(f'Rendering {len(posts)} posts, best of {options["repeat"]}:')
+        print(f'  libgravatar:  {before * 1000:.2f} ms per page, {before * per_row:.1f} us per row')
+        print(f'  stored hash:  {after * 1000:.2f} ms per page, {after * per_row:.1f} us per row')
+
+    def _posts(self, count):
+        """Return unsaved posts by distinct authors, so no database is needed."""
+        club = Club(name='Benchmark', location='London', description='Benchmark club')
+        now = timezone.now()
+        posts = []
+        for index in range(count):
+            email = f'author{index}@example.org'
+            author = User(id=index + 1, username=email, first_name='Author', last_name=str(index))
+            author.avatar_hash = gravatar_hash(author.avatar_address())
+            posts.append(Post(id=index + 1, author=author, club_own=club, message='Benchmark post', created_at=now))
+        return posts
@@ -0,0 +1,88 @@
+import re
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from clubs.middleware import user_memberships
+from clubs.models import Member
+from clubs.snapshots import club_posts
+from clubs.user_types import UserTypes
+from clubs.views import ApplyView, ClubListView, MemberListView
+from clubs.views.feed_views import feed_posts
+from clubs.views.member_views import applicants_of, members_of, officers_of
+
+# Plan lines that read a whole table rather than seeking through an index,
+# or that sort the rows rather than reading them in index order
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?: AS \w+)?\s*$'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+SORT_PATTERNS = {
+    'sqlite': re.compile(r'\bUSE TEMP B-TREE FOR ORDER BY\b'),
+    'postgresql': re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\b'),
+}
+
+class Command(BaseCommand):
+    help = "Explain the main query of each view and fail if any of them scans a whole table or sorts its rows"
+
+    def handle(self, *args, **options):
+        scan_pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        sort_pattern = SORT_PATTERNS.get(connection.vendor)
+        if scan_pattern is None:
+            raise CommandError(f'Query plans of {connection.vendor} databases are not supported')
+        owner = Member.objects.select_related('current_user', 'club_membership').filter(
+            user_type=UserTypes.CLUB_OWNER
+        ).first()
+        if owner is None:
+            raise CommandError('The database has no clubs with owners, run the seed command first')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        problems = []
+        for name, queryset, sorted_by_design in self.view_queries(owner.current_user, owner.club_membership):
+            plan = queryset.explain()
+            lines = plan.splitlines()
+            found = [f'scan of {match.group(1)}' for match in map(scan_pattern.search, lines) if match]
+            if not sorted_by_design:
+                found += ['sort' for line in lines if sort_pattern.search(line)]
+            print(f'{name}:')
+            print(plan)
+            print()
+            if found:
+                problems.append(f'{name} ({", ".join(found)})')
+        if problems:
+            raise CommandError(f'Full table scans or sorts in: {"; ".join(problems)}')
+        print('No view scans a whole table or sorts its rows')
+
+    def view_queries(self, user, club):
+        """Return the name, main query and whether a sort is expected of each view, as the user and for the club.
+
+        The queries are built by the code the views run. Only the feed without
+        the timeline sorts: it merges the posts of all the user's clubs, which
+        no single index holds in order.
+        """
+        posts_per_page = settings.POSTS_PER_PAGE
+        with override_settings(MATERIALIZED_FEED=False):
+            feed = feed_posts(user)[:posts_per_page]
+        with override_settings(MATERIALIZED_FEED=True):
+            materialized_feed = feed_posts(user)[:posts_per_page]
+        return [
+            ('feed', feed, True),
+            ('materialized feed', materialized_feed, False),
+            ('show_club', club_posts(club.id)[:posts_per_page + 1], False),
+            ('club_members', members_of(club), False),
+            ('manage_applicants', applicants_of(club), False),
+            ('manage_officers', officers_of(club), False),
+            ('member_list', self._list_view_queryset(MemberListView, user)[:settings.MEMBERS_PER_PAGE], False),
+            ('club_list', self._list_view_queryset(ClubListView, user)[:settings.CLUBS_PER_PAGE], False),
+            ('apply', self._list_view_queryset(ApplyView, user)[:settings.CLUBS_PER_PAGE], False),
+            ('navbar', user_memberships(user), False),
+        ]
+
+    def _list_view_queryset(self, view_class, user):
+        request = RequestFactory().get('/')
+        request.user = user
+        view = view_class()
+        view.setup(request)
+        return view.get_queryset()
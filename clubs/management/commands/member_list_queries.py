@@ -0,0 +1,74 @@
+import time
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Exists, OuterRef
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.models import Member, User
+from clubs.user_types import UserTypes
+
+
+class Command(BaseCommand):
+    help = (
+        'Replace the data with growing numbers of seeded users and check the member list '
+        'makes the same number of queries at each size'
+    )
+
+    SIZES = (1_000, 100_000, 1_000_000)
+    # The seed command's default user who owns its default club, so is always a member
+    USERNAME = 'jeb@example.org'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=Command.SIZES, help='Numbers of users to seed, in turn')
+        parser.add_argument('--clubs', type=int, default=50, help='Number of clubs to seed at each size')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the datasets')
+        parser.add_argument('--workers', type=int, default=1, help='Number of seed worker processes')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Number of rows inserted per transaction')
+
+    def handle(self, *args, **options):
+        if min(options['sizes']) < 1:
+            raise CommandError('Each size must be at least 1 user')
+        query_counts = {}
+        for size in sorted(options['sizes']):
+            call_command('unseed', fast=True)
+            call_command(
+                'seed', users=size, clubs=options['clubs'], posts=0, seed=options['seed'],
+                workers=options['workers'], batch_size=options['batch_size'],
+            )
+            for page, (queries, latency) in self.measure().items():
+                query_counts.setdefault(page, {})[size] = queries
+                print(f'{size:>9} users  {page:<14}{queries:>4} queries {latency * 1000:>9.1f} ms')
+
+        grown = [
+            f'{page} ({", ".join(f"{count} at {size} users" for size, count in counts.items())})'
+            for page, counts in query_counts.items() if len(set(counts.values())) > 1
+        ]
+        if grown:
+            raise CommandError(f'The number of queries changes with the number of users: {"; ".join(grown)}')
+        print('The member list makes the same number of queries at every size')
+
+    def measure(self):
+        """Return the queries and latency of the first, a middle and the last member list page"""
+        members = User.objects.filter(Exists(
+            Member.objects.filter(current_user=OuterRef('pk')).exclude(user_type=UserTypes.APPLICANT)
+        )).order_by('first_name', 'id')
+        middle = members.values_list('id', flat=True)[members.count() // 2]
+        client = Client(HTTP_HOST='127.0.0.1')
+        client.force_login(User.objects.get(username=Command.USERNAME))
+        url = reverse('member_list')
+        pages = {'first': url, 'after middle': f'{url}?after={middle}', 'before middle': f'{url}?before={middle}'}
+        # Every size starts from the same cached counts
+        cache.clear()
+        results = {}
+        for page, page_url in pages.items():
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = client.get(page_url)
+                latency = time.perf_counter() - started
+            if response.status_code != 200:
+                raise CommandError(f'GET {page_url} failed with status {response.status_code}')
+            results[page] = (len(queries), latency)
+        return results
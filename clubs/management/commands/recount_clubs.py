@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from clubs.models import Club
+
+class Command(BaseCommand):
+    help = 'Recount the owners, officers, members and applicants stored on every club from their memberships'
+
+    def handle(self, *args, **options):
+        drifted = Club.recountRoles()
+        print(f'Corrected the role counts of {drifted} club(s)')
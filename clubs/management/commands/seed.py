@@ -1,118 +1,198 @@
+from collections import deque
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.db.models import Max
 from faker import Faker
-from clubs.models import Club, User, Member
-from django.db.utils import IntegrityError
+from clubs.models import Club, Post, TimelineEntry, User, Member, gravatar_hash
+import itertools
+import multiprocessing
 import random
 from clubs.user_types import UserTypes
+from ._seed_rows import SCENARIOS, club_count, club_rows, popularity_cum_weights, post_rows, user_rows
 
 class Command(BaseCommand):
+    help = 'Seed the database with random users, clubs, memberships and posts'
+
     PASSWORD = "Password123"
     USER_COUNT = 150
     CLUB_COUNT = 5
+    POST_COUNT = 200
+    BATCH_SIZE = 1000
 
-    def __init__(self):
-        super().__init__()
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
         self.faker = Faker('en_GB')
 
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=Command.USER_COUNT, help='Number of random users to create')
+        parser.add_argument('--clubs', type=int, default=Command.CLUB_COUNT, help='Number of random clubs to create')
+        parser.add_argument('--posts', type=int, default=Command.POST_COUNT, help='Number of posts by the owners of the random clubs')
+        parser.add_argument('--batch-size', type=int, default=Command.BATCH_SIZE, help='Number of rows inserted per transaction')
+        parser.add_argument('--workers', type=int, default=1, help='Number of processes generating rows for this one to insert')
+        parser.add_argument('--seed', type=int, help='Random seed, to reproduce an earlier run')
+        parser.add_argument(
+            '--scenario', choices=SCENARIOS, default='uniform',
+            help='Shape of the memberships and posts: ' + '; '.join(f'{name}: {scenario.description}' for name, scenario in SCENARIOS.items()),
+        )
+
     def handle(self, *args, **options):
+        if options['clubs'] > 0 and options['users'] == 0:
+            raise CommandError('Random clubs need random users to own them')
+        if options['batch_size'] < 1:
+            raise CommandError('The batch size must be at least 1')
+        if options['workers'] < 1:
+            raise CommandError('There must be at least 1 worker')
+        self.batch_size = options['batch_size']
+        self.workers = options['workers']
+        self.seed = options['seed'] if options['seed'] is not None else random.randrange(2 ** 32)
+        self.scenario = SCENARIOS[options['scenario']]
+        print(f'Seeding with --seed {self.seed}')
+        self.faker.seed_instance(self.seed)
+        # Hashing is deliberately slow, and every seeded user has the same password
+        self.password = make_password(Command.PASSWORD)
         self.populate_reqired_users()
-        
-        self.create_users() 
-        self.create_clubs()
-        self.create_members() 
 
+        user_ids = self.create_users(options['users'])
+        club_ids = self.create_clubs(options['clubs'])
+        owner_ids = self.create_members(user_ids, club_ids)
+        self.create_posts(options['posts'], owner_ids)
+        Club.recountRoles()
+        if settings.MATERIALIZED_FEED:
+            TimelineEntry.rebuild()
+
+        self.print_club_sizes(club_ids)
         print('Seeding complete')
-    
-    def create_users(self):
-        """Populate database with users"""
-        user_count = 0
-        while user_count < Command.USER_COUNT:
-            print(f'Seeding user {user_count}',  end='\r')
-            try:
-                self._create_user()
-            except (IntegrityError):
-                continue
-            user_count += 1
-        print()
 
-    def create_clubs(self):
-        """Populate database with clubs"""
-        club_count = 0
-        while club_count < Command.CLUB_COUNT:
-            print(f'Seeding clubs {club_count}',  end='\r')
-            try:
-                self._create_club()
-            except (IntegrityError):
-                continue
-            club_count += 1
-        print()
+    def create_users(self, count):
+        """Populate database with users, returning their ids"""
+        # Numbering from past the highest id keeps emails unique across runs
+        # Bulk inserts skip User.save, so each avatar hash is set here
+        first_number = (User.objects.aggregate(highest_id=Max('id'))['highest_id'] or 0) + 1
+        users = (
+            User(
+                username=username,
+                avatar_hash=gravatar_hash(username),
+                first_name=first_name,
+                last_name=last_name,
+                password=self.password,
+                bio=bio,
+                chess_experience=chess_experience,
+                personal_statement=personal_statement,
+            )
+            for username, first_name, last_name, bio, chess_experience, personal_statement
+            in self._generate(user_rows, count, first_number)
+        )
+        self._insert(User, users, count, 'users')
+        return self._new_ids(User, first_number - 1)
 
-    def create_members(self):
-        """Populate database with members"""
-        member_count = 0
-        users = list(User.objects.all())
-        clubs = list(Club.objects.all())
-        while member_count < Command.USER_COUNT:
-            print(f'Seeding members {member_count}',  end='\r')
-            try:
-                rand = random.randint(0,Command.CLUB_COUNT-1)
-                self._create_member(users[member_count], clubs[rand])
-            except (IntegrityError):
-                continue
-            member_count += 1
-        print()
+    def create_clubs(self, count):
+        """Populate database with clubs, returning their ids"""
+        first_number = (Club.objects.aggregate(highest_id=Max('id'))['highest_id'] or 0) + 1
+        clubs = (
+            Club(name=name, location=location, description=description)
+            for name, location, description in self._generate(club_rows, count, first_number)
+        )
+        self._insert(Club, clubs, count, 'clubs')
+        return self._new_ids(Club, first_number - 1)
+
+    def create_members(self, user_ids, club_ids):
+        """Give each club a random owner and each user memberships of clubs drawn by popularity, returning the owners by club
+
+        The owners are returned from the most popular club down.
+        """
+        if not club_ids:
+            return {}
+        scenario = self.scenario
+        rng = random.Random(f'{self.seed}:members')
+        clubs = rng.sample(club_ids, len(club_ids))
+        cum_weights = popularity_cum_weights(len(clubs), scenario.club_size_exponent)
+        backlog_club_ids = set(clubs[:round(len(clubs) * scenario.backlog_club_share)])
+        owner_ids = {club_id: rng.choice(user_ids) for club_id in clubs}
+        owned = {(user_id, club_id) for club_id, user_id in owner_ids.items()}
+
+        def user_type(club_id):
+            applicant_share = scenario.backlog_applicant_share if club_id in backlog_club_ids else scenario.applicant_share
+            draw = rng.random()
+            if draw < scenario.officer_share:
+                return UserTypes.OFFICER
+            if draw < scenario.officer_share + applicant_share:
+                return UserTypes.APPLICANT
+            return UserTypes.MEMBER
 
-    def _create_user(self):
-        """Create a random user"""
-        first_name = self.faker.first_name()
-        last_name = self.faker.last_name()
-        username = self._email(first_name, last_name)
-        bio = self.faker.text(max_nb_chars=520)
-        chess_experience = self.faker.random_int(0, 3000)
-        personal_statement = self.faker.text(max_nb_chars=10000)
-        User.objects.create_user(
-            username,
-            first_name=first_name,
-            last_name=last_name,
-            password=Command.PASSWORD,
-            bio=bio,
-            chess_experience=chess_experience,
-            personal_statement=personal_statement,
+        def user_members(user_id):
+            count = min(club_count(rng, scenario.clubs_per_user), len(clubs))
+            for club_id in set(rng.choices(clubs, cum_weights=cum_weights, k=count)):
+                if (user_id, club_id) not in owned:
+                    yield Member(user_type=user_type(club_id), current_user_id=user_id, club_membership_id=club_id)
+
+        owners = (
+            Member(user_type=UserTypes.CLUB_OWNER, current_user_id=user_id, club_membership_id=club_id)
+            for club_id, user_id in owner_ids.items()
         )
-    
-    def _create_club_owner(self, user, club):
-        Member.objects.create(
-            user_type = UserTypes.CLUB_OWNER,
-            current_user=user,
-            club_membership=club,
+        members = itertools.chain(owners, itertools.chain.from_iterable(map(user_members, user_ids)))
+        self._insert(Member, members, None, 'members')
+        return owner_ids
+
+    def create_posts(self, count, owner_ids):
+        """Populate database with posts by the owners of the clubs, spread by popularity"""
+        if not owner_ids:
+            return
+        cum_weights = popularity_cum_weights(len(owner_ids), self.scenario.post_exponent)
+        posts = (
+            Post(club_own_id=club_id, author_id=author_id, message=message)
+            for club_id, author_id, message in self._generate(post_rows, count, 0, list(owner_ids.items()), cum_weights)
         )
-    
-    def _create_member(self, user, club):
-        """Create a random member"""
-        options = list(map(int ,UserTypes))
-        user_type = random.choices(options, cum_weights=(0, 0.2, 0.4, 0.4), k=1)
-        Member.objects.create(
-            user_type = user_type[0]+1,
-            current_user=user,
-            club_membership=club,
+        self._insert(Post, posts, count, 'posts')
+
+    def print_club_sizes(self, club_ids):
+        """Print how the members of the seeded clubs are spread"""
+        sizes = sorted(
+            (club.owner_count + club.officer_count + club.member_count for club in Club.objects.filter(id__in=club_ids)),
+            reverse=True,
         )
+        if sizes:
+            print(f'Club members: largest {sizes[0]}, median {sizes[len(sizes) // 2]}, smallest {sizes[-1]}')
 
-    def _create_club(self):
-        """Create a random club"""
-        name = self.faker.domain_word()
-        location = self.faker.city()
-        description=self.faker.text(max_nb_chars=500)
-        Club.objects.create(
-            name=name,
-            location=location,
-            description=description,
+    def _generate(self, row_function, count, first_number, *args):
+        """Yield count rows from row_function, called for each batch-sized shard of them in the worker processes"""
+        shards = (
+            (self.seed, index, first_number + start, min(self.batch_size, count - start), *args)
+            for index, start in enumerate(range(0, count, self.batch_size))
         )
-        self._create_club_owner(User.objects.order_by('?').first(), Club.objects.get(name=name))
+        if self.workers == 1:
+            for shard in shards:
+                yield from row_function(*shard)
+            return
+        # Forked workers must not share the database connections of this process
+        connections.close_all()
+        with multiprocessing.Pool(self.workers) as pool:
+            # Shards are consumed in order, and only a few are generated ahead of the inserts
+            pending = deque()
+            for shard in shards:
+                pending.append(pool.apply_async(row_function, shard))
+                if len(pending) >= 2 * self.workers:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
 
+    def _insert(self, model, objects, count, name):
+        """Insert the objects in batches, each in its own transaction"""
+        inserted = 0
+        while True:
+            batch = list(itertools.islice(objects, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+            inserted += len(batch)
+            print(f'Seeding {name} {inserted}' + (f'/{count}' if count is not None else ''), end='\r')
+        print()
 
-    def _email(self, first_name, last_name):
-        email = f'{first_name}.{last_name}@example.org'
-        return email
+    def _new_ids(self, model, highest_id):
+        """Return the ids of the rows inserted after the one with the highest id"""
+        return list(model.objects.filter(id__gt=highest_id).order_by('id').values_list('id', flat=True))
 
     def _username(self, first_name, last_name):
         username = f'@{first_name}{last_name}'
@@ -1,8 +1,57 @@
+from django.core.cache import cache
 from django.core.management.base import BaseCommand, CommandError
-from clubs.models import User, Member, Club
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from clubs.models import User, Member, Club, Post, TimelineEntry
+
+# Emptied outright by --fast, in dependency order
+CLUB_MODELS = (TimelineEntry, Post, Member, Club)
 
 class Command(BaseCommand):
+    help = 'Delete all clubs, memberships and posts and every user who is not staff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fast', action='store_true',
+            help='Empty the tables with bulk statements instead of deleting row by row through the ORM',
+        )
+        parser.add_argument('--vacuum', action='store_true', help='Reclaim the freed space afterwards (with --fast)')
+
     def handle(self, *args, **options):
-        Member.objects.all().delete()
-        User.objects.filter(is_staff=False, is_superuser=False).delete()
-        Club.objects.all().delete()
+        if options['vacuum'] and not options['fast']:
+            raise CommandError('--vacuum can only be used with --fast')
+        if options['fast']:
+            self.fast_unseed(options['vacuum'])
+        else:
+            Member.objects.all().delete()
+            User.objects.filter(is_staff=False, is_superuser=False).delete()
+            Club.objects.all().delete()
+        print('Unseeding complete')
+
+    def fast_unseed(self, vacuum):
+        """Empty the club tables and delete non-staff users with a few bulk statements"""
+        tables = [model._meta.db_table for model in CLUB_MODELS]
+        user_table = connection.ops.quote_name(User._meta.db_table)
+        non_staff = f'SELECT id FROM {user_table} WHERE NOT is_staff AND NOT is_superuser'
+        # Every other reference to a user cascades, so it goes with the user
+        user_references = [
+            (field.remote_field.through._meta.db_table, field.m2m_column_name()) for field in User._meta.many_to_many
+        ] + [
+            (relation.related_model._meta.db_table, relation.field.column) for relation in User._meta.related_objects
+            if relation.related_model not in CLUB_MODELS
+        ]
+        with transaction.atomic(), connection.cursor() as cursor:
+            # User ids keep counting up, so sessions of deleted users never log in as new ones
+            for statement in connection.ops.sql_flush(no_style(), tables, reset_sequences=True):
+                cursor.execute(statement)
+            for table, column in user_references:
+                cursor.execute(
+                    f'DELETE FROM {connection.ops.quote_name(table)} WHERE {connection.ops.quote_name(column)} IN ({non_staff})'
+                )
+            cursor.execute(f'DELETE FROM {user_table} WHERE id IN ({non_staff})')
+            print(f'Deleted {cursor.rowcount} users')
+        # Cached pages and snapshots of deleted clubs would otherwise be served for new clubs reusing their ids
+        cache.clear()
+        if vacuum:
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
@@ -0,0 +1,69 @@
+"""Middleware of the clubs app."""
+from django.utils.functional import cached_property
+from .caching import remembered_versions
+from .models import Member
+
+
+def user_memberships(user):
+    """Return all memberships of the user, including applications, with their clubs."""
+    return Member.objects.filter(current_user=user).select_related('club_membership')
+
+
+class MembershipContext:
+    """The requesting user's club memberships, loaded at most once per request."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def _memberships(self):
+        """Return the user's memberships keyed by club id."""
+        if not self.user.is_authenticated:
+            return {}
+        members = user_memberships(self.user)
+        return {member.club_membership_id: member for member in members}
+
+    def get(self, club_id):
+        """Return the user's membership of the club, or None if there is none."""
+        return self._memberships.get(int(club_id))
+
+    def user_type(self, club_id):
+        """Return the user's type in the club, or None if they are not in it.
+
+        Read from the loaded memberships rather than a cache of roles: every
+        request that checks a role also renders the navbar or reads the
+        membership row, so the memberships are loaded anyway.
+        """
+        member = self.get(club_id)
+        return member.user_type if member else None
+
+    @property
+    def myclubs(self):
+        """Return all memberships of the user, including applications."""
+        return list(self._memberships.values())
+
+    def reset(self):
+        """Forget the loaded memberships so they are fetched again on next use."""
+        self.__dict__.pop('_memberships', None)
+
+
+class MembershipMiddleware:
+    """Attach a lazily resolved MembershipContext to every request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.memberships = MembershipContext(request.user)
+        return self.get_response(request)
+
+
+class CacheVersionsMiddleware:
+    """Read each cache version at most once while handling a request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with remembered_versions():
+            return self.get_response(request)
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:01
+
+from hashlib import md5
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_avatar_hashes(apps, schema_editor):
+    """Hash the address each user signed up with, which is their username unless they set an email."""
+    User = apps.get_model('clubs', 'User')
+    users = []
+    for user in User.objects.only('id', 'email', 'username').iterator(chunk_size=BATCH_SIZE):
+        address = user.email or user.username
+        user.avatar_hash = md5(address.lower().strip().encode('utf-8')).hexdigest()
+        users.append(user)
+        if len(users) == BATCH_SIZE:
+            User.objects.bulk_update(users, ['avatar_hash'])
+            users = []
+    User.objects.bulk_update(users, ['avatar_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0003_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_hash',
+            field=models.CharField(default='d41d8cd98f00b204e9800998ecf8427e', editable=False, max_length=32),
+        ),
+        migrations.RunPython(backfill_avatar_hashes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0004_user_avatar_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='avatar_hash',
+            field=models.CharField(db_index=True, default='d41d8cd98f00b204e9800998ecf8427e', editable=False, max_length=32),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:06
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_roles(apps, schema_editor):
+    Club = apps.get_model('clubs', 'Club')
+    Member = apps.get_model('clubs', 'Member')
+    fields = {1: 'owner_count', 2: 'officer_count', 3: 'member_count', 4: 'applicant_count'}
+    counts = {}
+    for row in Member.objects.values('club_membership', 'user_type').annotate(count=Count('id')).order_by():
+        counts.setdefault(row['club_membership'], {})[fields[row['user_type']]] = row['count']
+    for club_id, club_counts in counts.items():
+        Club.objects.filter(id=club_id).update(**club_counts)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clubs', '0005_user_avatar_hash_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='club',
+            name='applicant_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='officer_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='club',
+            name='owner_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_roles, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,23 @@
-from django.db import connections, models
+from hashlib import md5
+from django.conf import settings
+from django.db import connection, connections, models, transaction
 from django.db.models.fields import DateTimeField
-from django.db.models import CheckConstraint, Q, F, constraints
+from django.db.models import CheckConstraint, Count, OuterRef, Q, F, Subquery, Value, constraints
+from django.db.models.functions import Coalesce, Greatest
 from .user_types import UserTypes
+from .caching import invalidate, invalidate_membership
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import AbstractUser
-from libgravatar import Gravatar
+from django.urls import reverse
+
+GRAVATAR_URL = 'https://www.gravatar.com/avatar/{hash}?size={size}&default=mp'
+
+
+def gravatar_hash(email):
+    """Return the Gravatar hash of an email address."""
+    return md5(email.lower().strip().encode('utf-8')).hexdigest()
+
 
 class User(AbstractUser):
     """User in a club."""
@@ -16,30 +28,111 @@ class User(AbstractUser):
     chess_experience = models.IntegerField(blank=False, validators = [MinValueValidator(0)], default=0)
     personal_statement = models.CharField(max_length=10000, blank=False, default="")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Kept in step with email by save(), so avatars cost no hashing to render
+    avatar_hash = models.CharField(max_length=32, editable=False, default=gravatar_hash(''), db_index=True)
 
     class Meta:
         """Model options."""
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='user_created_at_idx'),
+            models.Index(fields=['first_name', 'id'], name='user_first_name_idx'),
+        ]
 
     def full_name(self):
         return f'{self.first_name} {self.last_name}'
 
+    def save(self, *args, **kwargs):
+        """Save the user, rehashing their email address for their gravatar."""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            self.avatar_hash = gravatar_hash(self.avatar_address())
+        elif {'email', 'username'} & set(update_fields):
+            self.avatar_hash = gravatar_hash(self.avatar_address())
+            kwargs['update_fields'] = {*update_fields, 'avatar_hash'}
+        super().save(*args, **kwargs)
+
+    def avatar_address(self):
+        """Return the email address the user's avatar belongs to.
+
+        Users sign up with their email address as their username, and the
+        separate email field is usually left blank.
+        """
+        return self.email or self.username
+
     def gravatar(self, size=120):
-        """Return a URL to the user's gravatar."""
-        gravatar_object = Gravatar(self.email)
-        gravatar_url = gravatar_object.get_image(size=size, default='mp')
-        return gravatar_url
+        """Return a URL to the user's gravatar, or to their identicon when drawn locally."""
+        if settings.AVATAR_MODE == 'identicon':
+            return reverse('avatar', kwargs={'avatar_hash': self.avatar_hash, 'size': size})
+        return GRAVATAR_URL.format(hash=self.avatar_hash, size=size)
 
     def mini_gravatar(self):
         """Return a URL to a miniature version of the user's gravatar."""
         return self.gravatar(size=60)
 
 
+# The Club field counting the memberships of each user type
+ROLE_COUNT_FIELDS = {
+    UserTypes.CLUB_OWNER: 'owner_count',
+    UserTypes.OFFICER: 'officer_count',
+    UserTypes.MEMBER: 'member_count',
+    UserTypes.APPLICANT: 'applicant_count',
+}
+
+
 class Club(models.Model):
     """A new club."""
     name = models.CharField(max_length=50, blank=False, unique=True)
     location = models.CharField(max_length=50, blank=False)
     description = models.CharField(max_length=500, blank=False)
+    # Kept in step by the Member classmethods and by signal receivers for memberships saved or
+    # deleted through the ORM; the recount_clubs command repairs drift from bulk and raw writes
+    owner_count = models.PositiveIntegerField(default=0, editable=False)
+    officer_count = models.PositiveIntegerField(default=0, editable=False)
+    member_count = models.PositiveIntegerField(default=0, editable=False)
+    applicant_count = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        """Save the club, leaving its role counters to the UPDATEs that keep them in step.
+
+        The instance may have been loaded before a membership changed, and
+        writing back the counters it loaded would undo that change.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ROLE_COUNT_FIELDS.values()
+            ]
+        super().save(*args, **kwargs)
+
+    def members_count(self):
+        """Return the number of people in the club, applicants excluded."""
+        return self.owner_count + self.officer_count + self.member_count
+
+    def changeRoleCounts(self, changes):
+        """Adds the changes, keyed by user type, to the club's role counters in one UPDATE"""
+        # A counter that drifted below the memberships it counts stops at 0 rather than
+        # failing the UPDATE; recountRoles puts it right
+        updates = {
+            ROLE_COUNT_FIELDS[user_type]: Greatest(F(ROLE_COUNT_FIELDS[user_type]) + change, Value(0))
+            for user_type, change in changes.items() if change
+        }
+        if updates:
+            Club.objects.filter(id=self.id).update(**updates)
+
+    @classmethod
+    def recountRoles(self):
+        """Recounts the role counters of every club from its memberships, returning how many clubs had drifted"""
+        actual_counts = {f'actual_{field}': _role_count(user_type) for user_type, field in ROLE_COUNT_FIELDS.items()}
+        in_step = {field: F(f'actual_{field}') for field in ROLE_COUNT_FIELDS.values()}
+        with transaction.atomic():
+            drifted = list(Club.objects.annotate(**actual_counts).exclude(**in_step).values_list('id', flat=True))
+            if drifted:
+                Club.objects.filter(id__in=drifted).update(**{
+                    field: _role_count(user_type) for user_type, field in ROLE_COUNT_FIELDS.items()
+                })
+                invalidate('club', *drifted)
+        return len(drifted)
 
 
 class Member(models.Model):
@@ -57,6 +150,10 @@ class Member(models.Model):
     class Meta:
         """Model options."""
         unique_together = ('current_user', 'club_membership')
+        indexes = [
+            models.Index(fields=['club_membership', 'user_type'], name='member_club_type_idx'),
+            models.Index(fields=['current_user', 'user_type'], name='member_user_type_idx'),
+        ]
         constraints = [
             models.UniqueConstraint(fields=['club_membership'], condition=Q(user_type=UserTypes.CLUB_OWNER), name="there can't exist more than one club owner")
         ]
@@ -64,44 +161,167 @@ class Member(models.Model):
     @classmethod
     def acceptApplicant(self, user, club):
         """Converts an applicant to a member"""
-        Member.objects.filter(club_membership=club, current_user=user).update(user_type=UserTypes.MEMBER)
+        with transaction.atomic():
+            accepted_ids = self._changeUserTypes([user.id], club, [UserTypes.APPLICANT], UserTypes.MEMBER)
+            TimelineEntry.addClubPosts(accepted_ids, club)
 
     @classmethod
     def promoteMember(self, user, club):
         """Converts an member to an officer"""
-        Member.objects.filter(club_membership=club, current_user=user).update(user_type=UserTypes.OFFICER)
+        with transaction.atomic():
+            self._changeUserTypes([user.id], club, [UserTypes.MEMBER], UserTypes.OFFICER)
 
     @classmethod
     def transferOwnership(self, new_club_owner, old_club_owner, club):
-        """Converts an officer to an owner and the owner to an officer"""
-        Member.objects.filter(club_membership=club, current_user=old_club_owner).update(user_type=UserTypes.OFFICER)
-        Member.objects.filter(club_membership=club, current_user=new_club_owner).update(user_type=UserTypes.CLUB_OWNER)
+        """Converts an officer to an owner and the owner to an officer, returning whether ownership changed hands"""
+        # The club may never have two owners, not even within one statement, so the owner is
+        # demoted before the officer is promoted and both happen or neither does.
+        with transaction.atomic():
+            demoted = Member.objects.filter(
+                club_membership=club, current_user=old_club_owner, user_type=UserTypes.CLUB_OWNER
+            ).update(user_type=UserTypes.OFFICER)
+            promoted = demoted and Member.objects.filter(
+                club_membership=club, current_user=new_club_owner, user_type=UserTypes.OFFICER
+            ).exclude(current_user=old_club_owner).update(user_type=UserTypes.CLUB_OWNER)
+            if not promoted:
+                transaction.set_rollback(True)
+                return False
+        invalidate_membership([new_club_owner.id, old_club_owner.id], club.id)
+        return True
 
     @classmethod
     def demoteOfficer(self, user, club):
         """Converts an officer to a member"""
-        Member.objects.filter(club_membership=club, current_user=user).update(user_type=UserTypes.MEMBER)
+        with transaction.atomic():
+            self._changeUserTypes([user.id], club, [UserTypes.OFFICER], UserTypes.MEMBER)
 
     @classmethod
     def kickOutMember(self, user, club):
         """Kicks a member out from a club including officers"""
-        Member.objects.filter(club_membership=club, current_user=user).delete()
+        with transaction.atomic():
+            removed_ids = self._deleteMemberships([user.id], club, [UserTypes.MEMBER, UserTypes.OFFICER])
+            TimelineEntry.removeClubPosts(removed_ids, club)
 
     @classmethod
     def applyClub(self, user, club):
-        """Creates a membership object linked to the selected club as an applicant"""
-        Member.objects.create(
-            user_type = UserTypes.APPLICANT,
-            current_user=user,
-            club_membership=club,
-        )
+        """Creates a membership object linked to the selected club as an applicant, returning whether one was created"""
+        # A single INSERT that skips users who already have a membership of the club,
+        # so double submissions and retried requests are harmless
+        with transaction.atomic():
+            created = _execute(
+                f'{connection.ops.insert_statement(ignore_conflicts=True)} {_table(Member)} '
+                f'(user_type, current_user_id, club_membership_id) VALUES (%s, %s, %s) '
+                f'{connection.ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}',
+                [int(UserTypes.APPLICANT), user.id, club.id]
+            ) == 1
+            if created:
+                club.changeRoleCounts({UserTypes.APPLICANT: 1})
+        if created:
+            invalidate_membership([user.id], club.id)
+        return created
+
+    @classmethod
+    def createClubOwner(self, user, club):
+        """Creates the membership object of the user who founded the club"""
+        with transaction.atomic():
+            Member.objects.create(
+                user_type = UserTypes.CLUB_OWNER,
+                current_user=user,
+                club_membership=club,
+            )
+        invalidate_membership([user.id], club.id)
 
     @classmethod
     def decline_application(self, user, club):
         """Deletes a member object of type applicant"""
-        Member.objects.filter(club_membership=club, current_user=user).delete()
+        with transaction.atomic():
+            declined_ids = self._deleteMemberships([user.id], club, [UserTypes.APPLICANT])
+            TimelineEntry.removeClubPosts(declined_ids, club)
+
+    @classmethod
+    def acceptApplicants(self, user_ids, club):
+        """Converts the applicants among the users to members, returning how many were accepted"""
+        with transaction.atomic():
+            accepted_ids = self._changeUserTypes(user_ids, club, [UserTypes.APPLICANT], UserTypes.MEMBER)
+            TimelineEntry.addClubPosts(accepted_ids, club)
+        return len(accepted_ids)
+
+    @classmethod
+    def declineApplications(self, user_ids, club):
+        """Deletes the applications of the users, returning how many were declined"""
+        with transaction.atomic():
+            declined_ids = self._deleteMemberships(user_ids, club, [UserTypes.APPLICANT])
+            TimelineEntry.removeClubPosts(declined_ids, club)
+        return len(declined_ids)
+
+    @classmethod
+    def promoteMembers(self, user_ids, club):
+        """Converts the members among the users to officers, returning how many were promoted"""
+        with transaction.atomic():
+            return len(self._changeUserTypes(user_ids, club, [UserTypes.MEMBER], UserTypes.OFFICER))
+
+    @classmethod
+    def demoteOfficers(self, user_ids, club):
+        """Converts the officers among the users to members, returning how many were demoted"""
+        with transaction.atomic():
+            return len(self._changeUserTypes(user_ids, club, [UserTypes.OFFICER], UserTypes.MEMBER))
+
+    @classmethod
+    def kickOutMembers(self, user_ids, club):
+        """Kicks the members and officers among the users out, returning how many were removed"""
+        with transaction.atomic():
+            removed_ids = self._deleteMemberships(user_ids, club, [UserTypes.MEMBER, UserTypes.OFFICER])
+            TimelineEntry.removeClubPosts(removed_ids, club)
+        return len(removed_ids)
+
+    @classmethod
+    def _changeUserTypes(self, user_ids, club, from_user_types, to_user_type):
+        """Changes the user type of the users' memberships that currently have one of from_user_types, returning the ids of the users changed"""
+        # One statement per user type, so the club's counters know how many left each type
+        changes = {}
+        changed_ids = []
+        for from_user_type in from_user_types:
+            ids = self._lockedUserIds(user_ids, club, from_user_type)
+            if ids:
+                Member.objects.filter(
+                    club_membership=club,
+                    current_user_id__in=ids,
+                ).update(user_type=to_user_type)
+            changes[from_user_type] = -len(ids)
+            changed_ids += ids
+        club.changeRoleCounts({**changes, to_user_type: len(changed_ids)})
+        invalidate_membership(user_ids, club.id)
+        return changed_ids
+
+    @classmethod
+    def _deleteMemberships(self, user_ids, club, user_types):
+        """Deletes the users' memberships that currently have one of user_types, returning the ids of the users removed"""
+        changes = {}
+        deleted_ids = []
+        for user_type in user_types:
+            ids = self._lockedUserIds(user_ids, club, user_type)
+            if ids:
+                # Deleted in SQL, as the post_delete receiver would count each membership again
+                _execute(
+                    f'DELETE FROM {_table(Member)} WHERE club_membership_id = %s '
+                    f'AND current_user_id IN ({", ".join(["%s"] * len(ids))})',
+                    [club.id, *ids]
+                )
+            changes[user_type] = -len(ids)
+            deleted_ids += ids
+        club.changeRoleCounts(changes)
+        invalidate_membership(user_ids, club.id)
+        return deleted_ids
+
+    @classmethod
+    def _lockedUserIds(self, user_ids, club, user_type):
+        """Returns the ids of the users whose membership of the club has the user type, locking those memberships"""
+        return list(Member.objects.select_for_update().filter(
+            club_membership=club,
+            current_user_id__in=user_ids,
+            user_type=user_type,
+        ).values_list('current_user_id', flat=True))
 
-#TODO make all class methods
 
 class Post(models.Model):
     """Posts by users in their clubs."""
@@ -114,3 +334,94 @@ class Post(models.Model):
         """Model options."""
 
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['club_own', '-id'], name='post_club_id_idx'),
+        ]
+
+
+class TimelineEntry(models.Model):
+    """A post materialized into the feed of one of its club's members.
+
+    Only maintained while settings.MATERIALIZED_FEED is on; the
+    backfill_timeline command rebuilds the table from scratch.
+    """
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        """Model options."""
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', 'club'], name='timeline_user_club_idx'),
+        ]
+
+    @classmethod
+    def fanOut(self, post):
+        """Adds a new post to the timelines of its club's members"""
+        if not settings.MATERIALIZED_FEED:
+            return
+        _execute(
+            f'INSERT INTO {_table(TimelineEntry)} (user_id, post_id, club_id) '
+            f'SELECT current_user_id, %s, club_membership_id FROM {_table(Member)} '
+            f'WHERE club_membership_id = %s AND user_type <> %s',
+            [post.id, post.club_own_id, int(UserTypes.APPLICANT)]
+        )
+
+    @classmethod
+    def addClubPosts(self, user_ids, club):
+        """Adds all posts of the club to the timelines of the users, who must have just joined it"""
+        if not settings.MATERIALIZED_FEED or not user_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        _execute(
+            f'INSERT INTO {_table(TimelineEntry)} (user_id, post_id, club_id) '
+            f'SELECT member.current_user_id, post.id, post.club_own_id '
+            f'FROM {_table(Post)} post '
+            f'INNER JOIN {_table(Member)} member ON member.club_membership_id = post.club_own_id '
+            f'WHERE post.club_own_id = %s AND member.user_type <> %s '
+            f'AND member.current_user_id IN ({placeholders}) '
+            f'AND NOT EXISTS (SELECT 1 FROM {_table(TimelineEntry)} entry '
+            f'WHERE entry.user_id = member.current_user_id AND entry.post_id = post.id)',
+            [club.id, int(UserTypes.APPLICANT), *user_ids]
+        )
+
+    @classmethod
+    def removeClubPosts(self, user_ids, club):
+        """Removes all posts of the club from the timelines of the users, who must have just left it"""
+        if not settings.MATERIALIZED_FEED or not user_ids:
+            return
+        TimelineEntry.objects.filter(user_id__in=user_ids, club=club).delete()
+
+    @classmethod
+    def rebuild(self):
+        """Rebuilds every timeline from the current posts and memberships, returning the entry count"""
+        with transaction.atomic():
+            TimelineEntry.objects.all().delete()
+            return _execute(
+                f'INSERT INTO {_table(TimelineEntry)} (user_id, post_id, club_id) '
+                f'SELECT member.current_user_id, post.id, post.club_own_id '
+                f'FROM {_table(Post)} post '
+                f'INNER JOIN {_table(Member)} member ON member.club_membership_id = post.club_own_id '
+                f'WHERE member.user_type <> %s',
+                [int(UserTypes.APPLICANT)]
+            )
+
+
+def _role_count(user_type):
+    """Return an expression counting the memberships of the user type in the outer club."""
+    memberships = Member.objects.filter(club_membership=OuterRef('pk'), user_type=user_type)
+    return Coalesce(Subquery(memberships.order_by().values('club_membership').annotate(count=Count('pk')).values('count')), 0)
+
+
+def _execute(sql, params):
+    """Execute raw SQL, returning the number of rows it changed."""
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _table(model):
+    """Return the quoted table name of the model for use in raw SQL."""
+    return connection.ops.quote_name(model._meta.db_table)
@@ -0,0 +1,180 @@
+"""Keyset pagination.
+
+A keyset page is located by the row it follows (or precedes) rather than by
+its number, so fetching it is an index seek no matter how deep it is and no
+COUNT of the whole result is ever needed.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from .caching import get_versions
+
+
+class KeysetPage:
+    """A page of results between two cursors."""
+
+    is_keyset = True
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        """Return the cursor of the page after this one."""
+        return self.object_list[-1].pk if self._has_next and self.object_list else None
+
+    @property
+    def previous_cursor(self):
+        """Return the cursor of the page before this one."""
+        return self.object_list[0].pk if self._has_previous and self.object_list else None
+
+
+class KeysetPaginator:
+    """Paginates a queryset by seeking past the row identified by a cursor.
+
+    The ordering must be unique, so it should end with the primary key, e.g.
+    ('first_name', 'id') or ('-id',), or with an annotation named in
+    pk_aliases that equals it. Cursors are primary keys of rows.
+    """
+
+    def __init__(self, queryset, per_page, ordering, pk_aliases=()):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        self.pk_fields = {'id', 'pk', *pk_aliases}
+
+    def page(self, after=None, before=None):
+        """Return the page following the row `after`, preceding the row `before`, or the first page."""
+        if after is not None:
+            values = self._cursor_values(after)
+            if values is not None:
+                rows = self._fetch(self._seek(values, forwards=True), forwards=True)
+                return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, True)
+        if before is not None:
+            values = self._cursor_values(before)
+            if values is not None:
+                rows = self._fetch(self._seek(values, forwards=False), forwards=False)
+                has_previous = len(rows) > self.per_page
+                return KeysetPage(rows[:self.per_page][::-1], True, has_previous)
+        rows = self._fetch(Q(), forwards=True)
+        return KeysetPage(rows[:self.per_page], len(rows) > self.per_page, False)
+
+    def last_page(self):
+        """Return the last page, seeking from the end of the ordering."""
+        rows = self._fetch(Q(), forwards=False)
+        return KeysetPage(rows[:self.per_page][::-1], False, len(rows) > self.per_page)
+
+    def _fetch(self, condition, forwards):
+        ordering = [
+            f'-{field}' if descending == forwards else field
+            for field, descending in self.ordering
+        ]
+        return list(self.queryset.filter(condition).order_by(*ordering)[:self.per_page + 1])
+
+    def _cursor_values(self, cursor):
+        """Return the ordering values of the cursor row, or None for an invalid cursor."""
+        try:
+            pk = int(cursor)
+        except (TypeError, ValueError):
+            return None
+        fields = [field for field, _ in self.ordering]
+        if all(field in self.pk_fields for field in fields):
+            return [pk] * len(fields)
+        row = self.queryset.model._default_manager.filter(pk=pk).values_list(*fields).first()
+        return list(row) if row is not None else None
+
+    def _seek(self, values, forwards):
+        """Return the condition selecting rows strictly past the cursor values."""
+        condition = Q()
+        for index, (field, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending == forwards else 'gt'
+            step = Q(**{f'{field}__{lookup}': values[index]})
+            for previous_index, (previous_field, _) in enumerate(self.ordering[:index]):
+                step &= Q(**{previous_field: values[previous_index]})
+            condition |= step
+        return condition
+
+
+def keyset_page(paginator, query, next_param='after', previous_param='before', last_param=None):
+    """Return the page of the paginator selected by the cursors in the query parameters."""
+    if last_param is not None and last_param in query:
+        return paginator.last_page()
+    return paginator.page(after=query.get(next_param), before=query.get(previous_param))
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that caches the object count instead of counting on every request.
+
+    Counts are cached per (count_kind, count_scope) under the versions of the
+    count_tables, which are replaced whenever one of those tables is written
+    to, and expire after PAGINATOR_COUNT_TIMEOUT seconds regardless. Counts of
+    a whole table beyond PAGINATOR_ESTIMATE_THRESHOLD rows come from the
+    database's statistics instead of an exact COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, count_kind, count_scope='all', count_tables=(), **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_kind = count_kind
+        self.count_scope = count_scope
+        self.count_tables = count_tables
+
+    @cached_property
+    def count(self):
+        """Return the total number of objects, from the cache when possible."""
+        versions = get_versions('table', self.count_tables)
+        version = ':'.join(versions[table] for table in self.count_tables)
+        key = f'clubs:count:{self.count_kind}:{self.count_scope}:{version}'
+        count = cache.get(key)
+        if count is None:
+            count = self._estimated_count()
+            if count is None:
+                count = self.object_list.count()
+            cache.set(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+    def _estimated_count(self):
+        """Return the planner's row estimate for an unfiltered, very large table, otherwise None."""
+        query = self.object_list.query
+        if query.where or query.distinct or query.low_mark or query.high_mark is not None:
+            return None
+        connection = connections[self.object_list.db]
+        table = self.object_list.model._meta.db_table
+        if connection.vendor == 'postgresql':
+            sql = 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s'
+        elif connection.vendor == 'sqlite':
+            # Only available once ANALYZE has been run
+            sql = 'SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+        else:
+            return None
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(sql, [table])
+                row = cursor.fetchone()
+        except DatabaseError:
+            return None
+        if row is None or row[0] is None or row[0] < settings.PAGINATOR_ESTIMATE_THRESHOLD:
+            return None
+        return int(row[0])
@@ -0,0 +1,82 @@
+"""Signal handlers of the clubs app."""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .caching import invalidate, invalidate_membership
+from .models import Club, Member, Post, User
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+def invalidate_cached_membership(sender, instance, **kwargs):
+    """Memberships saved or deleted outside the Member classmethods still invalidate what is cached from them."""
+    invalidate_membership([instance.current_user_id], instance.club_membership_id)
+
+
+@receiver(pre_save, sender=Member)
+def remember_stored_membership(sender, instance, raw, update_fields, **kwargs):
+    """Saving a membership may move it between role counters, so what it was stored as is read first."""
+    instance._stored_role = None
+    role_fields = {'user_type', 'club_membership', 'club_membership_id'}
+    if instance.pk is not None and not raw and (update_fields is None or role_fields & set(update_fields)):
+        instance._stored_role = Member.objects.filter(pk=instance.pk).values_list('club_membership_id', 'user_type').first()
+
+
+@receiver(post_save, sender=Member)
+def count_saved_membership(sender, instance, created, raw, **kwargs):
+    """Memberships created or saved under a new user type or club move their clubs' role counters in the same transaction."""
+    if raw:
+        return
+    stored_role = getattr(instance, '_stored_role', None)
+    if created:
+        Club(id=instance.club_membership_id).changeRoleCounts({instance.user_type: 1})
+    elif stored_role is not None and stored_role != (instance.club_membership_id, instance.user_type):
+        stored_club_id, stored_user_type = stored_role
+        Club(id=stored_club_id).changeRoleCounts({stored_user_type: -1})
+        Club(id=instance.club_membership_id).changeRoleCounts({instance.user_type: 1})
+
+
+@receiver(post_delete, sender=Member)
+def count_deleted_membership(sender, instance, **kwargs):
+    """Memberships deleted through the ORM, including by cascade, leave their club's role counter."""
+    Club(id=instance.club_membership_id).changeRoleCounts({instance.user_type: -1})
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def invalidate_cached_club(sender, instance, **kwargs):
+    """Edited and deleted clubs orphan everything cached about them, including what only shows the club itself."""
+    invalidate('club', instance.id)
+    invalidate('club_profile', instance.id)
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def invalidate_cached_club_counts(sender, instance, **kwargs):
+    """Cached counts of clubs are stale once a club is created or deleted."""
+    invalidate('table', 'club')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_posts(sender, instance, **kwargs):
+    """Cached counts of posts and the posts in club snapshots are stale once a post is created or deleted."""
+    invalidate('table', 'post')
+    invalidate('club_posts', instance.club_own_id)
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_profile(sender, instance, created, update_fields, **kwargs):
+    """Rendered fragments and pages showing the user are stale once their profile is saved, but not on every log in.
+
+    The pages showing the user are those of the clubs they are in or have
+    posted to, and the feeds that include those clubs.
+    """
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    invalidate('profile', instance.id)
+    club_ids = {
+        *Member.objects.filter(current_user=instance).values_list('club_membership_id', flat=True),
+        *Post.objects.filter(author=instance).values_list('club_own_id', flat=True).distinct(),
+    }
+    if club_ids:
+        invalidate('club', *club_ids)
@@ -0,0 +1,57 @@
+"""Cached snapshots of what a club page shows every visitor.
+
+A snapshot is stored under the current versions of its club and of the
+club's posts. Edits to the club, membership changes and profile changes of
+its members and post authors replace the club's version, new and deleted
+posts replace the posts' version, so a stale snapshot is never read.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from .caching import get_version_string
+from .models import Club, Post, User
+from .user_types import UserTypes
+
+
+class ClubSnapshot:
+    """The parts of a club page that are the same for every visitor."""
+
+    def __init__(self, club, owner, posts, has_more_posts):
+        self.club = club
+        self.owner = owner
+        self.posts = posts
+        self.has_more_posts = has_more_posts
+
+    @property
+    def members_count(self):
+        return self.club.members_count()
+
+
+def club_posts(club_id):
+    """Return the club's posts, newest first, with what their rows show."""
+    return Post.objects.filter(club_own_id=club_id).select_related('author', 'club_own').defer(
+        'author__bio', 'author__personal_statement'
+    ).order_by('-id')
+
+
+def get_club_snapshot(club_id):
+    """Return the snapshot of the club, building and caching it if needed, or None if there is no such club."""
+    club_id = int(club_id)
+    key = f'clubs:snapshot:{club_id}:{get_version_string(("club", club_id), ("club_posts", club_id))}'
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = _build_club_snapshot(club_id)
+        if snapshot is None:
+            return None
+        cache.set(key, snapshot, settings.CLUB_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def _build_club_snapshot(club_id):
+    club = Club.objects.filter(id=club_id).first()
+    if club is None:
+        return None
+    owner = User.objects.filter(
+        member__club_membership=club, member__user_type=UserTypes.CLUB_OWNER
+    ).only('id', 'username', 'email', 'first_name', 'last_name', 'bio', 'avatar_hash').first()
+    posts = list(club_posts(club_id)[:settings.POSTS_PER_PAGE + 1])
+    return ClubSnapshot(club, owner, posts[:settings.POSTS_PER_PAGE], len(posts) > settings.POSTS_PER_PAGE)
@@ -0,0 +1,42 @@
+"""Template tags rendering post rows through the fragment cache."""
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+from clubs.caching import get_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def cached_post_rows(posts):
+    """Render the table rows of the posts, reusing rows rendered by earlier requests.
+
+    A row is cached under its post and the versions of its author's profile
+    and of its club's profile, so editing either renders it again but
+    membership changes do not. Its timestamp is made relative in the
+    browser, which keeps the row the same over time.
+    """
+    posts = list(posts)
+    profile_versions = get_versions('profile', {post.author_id for post in posts})
+    club_versions = get_versions('club_profile', {post.club_own_id for post in posts})
+    keys = {
+        post.id: (
+            f'clubs:post_row:{post.id}:{settings.AVATAR_MODE}:'
+            f'{profile_versions[post.author_id]}:{club_versions[post.club_own_id]}'
+        )
+        for post in posts
+    }
+    cached_rows = cache.get_many(keys.values())
+    row_template = get_template('partials/post_as_table_row.html')
+    rows = []
+    rendered_rows = {}
+    for post in posts:
+        row = cached_rows.get(keys[post.id])
+        if row is None:
+            row = rendered_rows[keys[post.id]] = row_template.render({'post': post})
+        rows.append(row)
+    if rendered_rows:
+        cache.set_many(rendered_rows, settings.POST_ROW_TIMEOUT)
+    return mark_safe(''.join(rows))
@@ -0,0 +1,54 @@
+from unittest import mock
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from clubs.caching import get_version, get_version_string, invalidate
+from clubs.middleware import CacheVersionsMiddleware
+
+
+class CacheVersionsMiddlewareTestCase(TestCase):
+    """Tests of the per-request memory of cache versions."""
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def _handle(self, view):
+        return CacheVersionsMiddleware(view)(self.request)
+
+    def test_versions_are_read_from_the_cache_once_per_request(self):
+        def view(request):
+            get_version_string(('club', 1), ('club_posts', 1))
+            with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+                self.assertEqual(get_version('club', 1), get_version('club', '1'))
+                get_version_string(('club_posts', 1), ('club', 1))
+            get_many.assert_not_called()
+            return HttpResponse()
+        self._handle(view)
+
+    def test_versions_are_read_together(self):
+        def view(request):
+            with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+                get_version_string(('club', 1), ('club_posts', 1), ('user', 2))
+            get_many.assert_called_once()
+            return HttpResponse()
+        self._handle(view)
+
+    def test_invalidation_is_seen_by_the_same_request(self):
+        def view(request):
+            old_version = get_version('club', 1)
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate('club', 1)
+            self.assertNotEqual(get_version('club', 1), old_version)
+            self.assertEqual(get_version('club', 1), cache.get('clubs:version:club:1'))
+            return HttpResponse()
+        self._handle(view)
+
+    def test_versions_are_read_again_by_the_next_request(self):
+        versions = []
+        def view(request):
+            versions.append(get_version('club', 1))
+            return HttpResponse()
+        self._handle(view)
+        cache.set('clubs:version:club:1', 'changed elsewhere', None)
+        self._handle(view)
+        self.assertEqual(versions[1], 'changed elsewhere')
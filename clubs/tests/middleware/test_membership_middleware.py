@@ -0,0 +1,100 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.middleware import MembershipContext
+from clubs.models import User, Member, Club
+from clubs.user_types import UserTypes
+
+class MembershipMiddlewareTestCase(TestCase):
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+        'clubs/tests/fixtures/other_club.json'
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(username='johndoe@example.org')
+        self.applicant = User.objects.get(username='janedoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        self.other_club = Club.objects.get(name='Club2')
+        Member.objects.create(
+            user_type=UserTypes.CLUB_OWNER,
+            current_user=self.owner,
+            club_membership=self.club
+        )
+        Member.objects.create(
+            user_type=UserTypes.APPLICANT,
+            current_user=self.owner,
+            club_membership=self.other_club
+        )
+        Member.objects.create(
+            user_type=UserTypes.APPLICANT,
+            current_user=self.applicant,
+            club_membership=self.club
+        )
+
+    def test_context_resolves_memberships_in_one_query(self):
+        memberships = MembershipContext(self.owner)
+        with self.assertNumQueries(1):
+            self.assertEqual(memberships.user_type(self.club.id), UserTypes.CLUB_OWNER)
+            self.assertEqual(memberships.user_type(str(self.other_club.id)), UserTypes.APPLICANT)
+            self.assertIsNone(memberships.get(9999))
+            self.assertEqual(len(memberships.myclubs), 2)
+            self.assertEqual(memberships.get(self.club.id).club_membership.name, 'Club')
+
+    def test_context_resolves_memberships_in_one_query_with_a_warm_cache(self):
+        MembershipContext(self.owner).user_type(self.club.id)
+        memberships = MembershipContext(self.owner)
+        with self.assertNumQueries(1):
+            self.assertEqual(memberships.user_type(self.club.id), UserTypes.CLUB_OWNER)
+            self.assertEqual(memberships.user_type(self.other_club.id), UserTypes.APPLICANT)
+            self.assertEqual(len(memberships.myclubs), 2)
+
+    def test_roles_are_read_without_the_cache(self):
+        memberships = MembershipContext(self.owner)
+        with mock.patch.object(cache, 'get_many') as get_many, mock.patch.object(cache, 'get') as get:
+            self.assertEqual(memberships.user_type(self.club.id), UserTypes.CLUB_OWNER)
+        get_many.assert_not_called()
+        get.assert_not_called()
+
+    def test_reset_reloads_memberships(self):
+        memberships = MembershipContext(self.owner)
+        self.assertIsNone(memberships.get(3))
+        Member.objects.create(
+            user_type=UserTypes.APPLICANT,
+            current_user=self.owner,
+            club_membership=Club.objects.get(id=3)
+        )
+        self.assertIsNone(memberships.get(3))
+        memberships.reset()
+        self.assertEqual(memberships.user_type(3), UserTypes.APPLICANT)
+
+    def test_decorated_view_looks_up_memberships_once(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        url = reverse('manage_applicants', kwargs={'club_id': self.club.id})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Club2')
+        membership_queries = [
+            query for query in context.captured_queries
+            if 'WHERE "clubs_member"."current_user_id" = ' in query['sql']
+        ]
+        self.assertEqual(len(membership_queries), 1)
+
+    def test_decorated_view_redirects_to_feed_for_unknown_club(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        url = reverse('manage_applicants', kwargs={'club_id': 9999})
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse('feed'), status_code=302, target_status_code=200)
+
+    def test_decorated_view_redirects_to_club_when_not_a_member(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        url = reverse('manage_applicants', kwargs={'club_id': 3})
+        response = self.client.get(url)
+        self.assertRedirects(response, reverse('show_club', kwargs={'club_id': 3}), status_code=302, fetch_redirect_response=False)
@@ -0,0 +1,129 @@
+from django.test import TestCase
+from clubs.models import User, Club, Member
+from clubs.user_types import UserTypes
+
+
+class ClubRoleCountsTestCase(TestCase):
+    """Tests of the role counters stored on clubs."""
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(username='johndoe@example.org')
+        self.user = User.objects.get(username='janedoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.createClubOwner(self.owner, self.club)
+
+    def test_created_memberships_are_counted(self):
+        Member.objects.create(user_type=UserTypes.OFFICER, current_user=self.user, club_membership=self.club)
+        self._assert_role_counts(owners=1, officers=1)
+
+    def test_deleted_memberships_are_uncounted(self):
+        membership = Member.objects.create(user_type=UserTypes.OFFICER, current_user=self.user, club_membership=self.club)
+        membership.delete()
+        self._assert_role_counts(owners=1)
+
+    def test_memberships_of_deleted_users_are_uncounted(self):
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        self.user.delete()
+        self._assert_role_counts(owners=1)
+
+    def test_saving_a_new_user_type_moves_the_count(self):
+        membership = Member.objects.create(user_type=UserTypes.APPLICANT, current_user=self.user, club_membership=self.club)
+        membership.user_type = UserTypes.MEMBER
+        membership.save()
+        self._assert_role_counts(owners=1, members=1)
+        membership.user_type = UserTypes.OFFICER
+        membership.save(update_fields=['user_type'])
+        self._assert_role_counts(owners=1, officers=1)
+
+    def test_saving_the_same_user_type_keeps_counts(self):
+        membership = Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        membership.save()
+        Member.objects.get(id=membership.id).save()
+        self._assert_role_counts(owners=1, members=1)
+
+    def test_saving_a_membership_under_another_club_moves_the_count(self):
+        other_club = Club.objects.create(name='Other club', location='Location', description='Description')
+        membership = Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        membership.club_membership = other_club
+        membership.save()
+        self._assert_role_counts(owners=1)
+        other_club.refresh_from_db()
+        self.assertEqual(other_club.member_count, 1)
+
+    def test_applying_counts_an_applicant(self):
+        Member.applyClub(self.user, self.club)
+        self._assert_role_counts(owners=1, applicants=1)
+
+    def test_membership_transitions_move_counts(self):
+        Member.applyClub(self.user, self.club)
+        Member.acceptApplicant(self.user, self.club)
+        self._assert_role_counts(owners=1, members=1)
+        Member.promoteMember(self.user, self.club)
+        self._assert_role_counts(owners=1, officers=1)
+        Member.demoteOfficer(self.user, self.club)
+        self._assert_role_counts(owners=1, members=1)
+        Member.kickOutMember(self.user, self.club)
+        self._assert_role_counts(owners=1)
+
+    def test_declining_uncounts_the_applicant(self):
+        Member.applyClub(self.user, self.club)
+        Member.decline_application(self.user, self.club)
+        self._assert_role_counts(owners=1)
+
+    def test_bulk_removals_are_counted_once(self):
+        Member.applyClub(self.user, self.club)
+        Member.applyClub(self.owner, self.club)
+        self.assertEqual(Member.declineApplications([self.user.id, self.owner.id], self.club), 1)
+        self._assert_role_counts(owners=1)
+
+    def test_transitions_of_other_user_types_change_nothing(self):
+        Member.applyClub(self.user, self.club)
+        Member.promoteMember(self.user, self.club)
+        Member.kickOutMember(self.user, self.club)
+        self._assert_role_counts(owners=1, applicants=1)
+
+    def test_transferring_ownership_keeps_counts(self):
+        Member.objects.create(user_type=UserTypes.OFFICER, current_user=self.user, club_membership=self.club)
+        Member.transferOwnership(self.user, self.owner, self.club)
+        self._assert_role_counts(owners=1, officers=1)
+
+    def test_members_count_excludes_applicants(self):
+        Member.objects.create(user_type=UserTypes.APPLICANT, current_user=self.user, club_membership=self.club)
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.members_count(), 1)
+
+    def test_saving_a_stale_club_keeps_counts(self):
+        stale_club = Club.objects.get(id=self.club.id)
+        Member.applyClub(self.user, self.club)
+        stale_club.description = 'New description'
+        stale_club.save()
+        self._assert_role_counts(owners=1, applicants=1)
+        self.assertEqual(self.club.description, 'New description')
+
+    def test_removing_an_uncounted_membership_leaves_counter_at_zero(self):
+        Member.objects.bulk_create([Member(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)])
+        Member.kickOutMember(self.user, self.club)
+        self._assert_role_counts(owners=1)
+        Member.objects.bulk_create([Member(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)])
+        Member.objects.get(current_user=self.user).delete()
+        self._assert_role_counts(owners=1)
+
+    def test_recount_repairs_drift(self):
+        Member.objects.filter(current_user=self.owner).update(user_type=UserTypes.MEMBER)
+        Club.objects.filter(id=self.club.id).update(applicant_count=5)
+        self.assertEqual(Club.recountRoles(), 1)
+        self._assert_role_counts(members=1)
+        self.assertEqual(Club.recountRoles(), 0)
+
+    def _assert_role_counts(self, owners=0, officers=0, members=0, applicants=0):
+        self.club.refresh_from_db()
+        self.assertEqual(
+            (self.club.owner_count, self.club.officer_count, self.club.member_count, self.club.applicant_count),
+            (owners, officers, members, applicants),
+        )
@@ -0,0 +1,93 @@
+from django.test import TestCase, override_settings
+from clubs.models import User, Member, Club, Post, TimelineEntry
+from clubs.user_types import UserTypes
+
+@override_settings(MATERIALIZED_FEED=True)
+class TimelineEntryModelTestCase(TestCase):
+    """Tests of the timelines maintained by posts and Member transitions."""
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+        'clubs/tests/fixtures/other_club.json',
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(username='janedoe@example.org')
+        self.member = User.objects.get(username='alexjordan@example.org')
+        self.applicant = User.objects.get(username='johndoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.owner, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.member, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.APPLICANT, current_user=self.applicant, club_membership=self.club)
+
+    def test_fan_out_reaches_members_but_not_applicants(self):
+        post = self._create_post()
+        self.assertEqual(self._timeline(self.owner), [post.id])
+        self.assertEqual(self._timeline(self.member), [post.id])
+        self.assertEqual(self._timeline(self.applicant), [])
+
+    def test_accepted_applicant_receives_earlier_posts(self):
+        first_post = self._create_post()
+        second_post = self._create_post()
+        Member.acceptApplicant(self.applicant, self.club)
+        self.assertEqual(self._timeline(self.applicant), [second_post.id, first_post.id])
+
+    def test_bulk_accept_receives_earlier_posts_once(self):
+        post = self._create_post()
+        Member.acceptApplicants([self.applicant.id, self.member.id], self.club)
+        self.assertEqual(self._timeline(self.applicant), [post.id])
+        self.assertEqual(self._timeline(self.member), [post.id])
+
+    def test_kicked_out_member_loses_club_posts(self):
+        self._create_post()
+        other_club = Club.objects.get(name='Club2')
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.member, club_membership=other_club)
+        other_post = self._create_post(other_club)
+        Member.kickOutMember(self.member, self.club)
+        self.assertEqual(self._timeline(self.member), [other_post.id])
+
+    def test_declined_applicant_has_no_club_posts(self):
+        self._create_post()
+        Member.decline_application(self.applicant, self.club)
+        self.assertEqual(self._timeline(self.applicant), [])
+
+    def test_bulk_decline_keeps_posts_of_those_still_in_the_club(self):
+        post = self._create_post()
+        Member.declineApplications([self.applicant.id, self.member.id, self.owner.id], self.club)
+        self.assertEqual(self._timeline(self.member), [post.id])
+        self.assertEqual(self._timeline(self.owner), [post.id])
+
+    def test_bulk_kick_out_keeps_posts_of_those_still_in_the_club(self):
+        post = self._create_post()
+        Member.kickOutMembers([self.member.id, self.owner.id, self.applicant.id], self.club)
+        self.assertEqual(self._timeline(self.member), [])
+        self.assertEqual(self._timeline(self.owner), [post.id])
+
+    def test_bulk_accept_only_fills_timelines_of_accepted_users(self):
+        post = self._create_post()
+        TimelineEntry.objects.filter(user=self.member).delete()
+        Member.acceptApplicants([self.applicant.id, self.member.id], self.club)
+        self.assertEqual(self._timeline(self.applicant), [post.id])
+        self.assertEqual(self._timeline(self.member), [])
+
+    def test_rebuild_matches_memberships(self):
+        post = self._create_post()
+        TimelineEntry.objects.all().delete()
+        self.assertEqual(TimelineEntry.rebuild(), 2)
+        self.assertEqual(self._timeline(self.owner), [post.id])
+        self.assertEqual(self._timeline(self.applicant), [])
+
+    @override_settings(MATERIALIZED_FEED=False)
+    def test_nothing_is_materialized_when_disabled(self):
+        self._create_post()
+        self.assertEqual(TimelineEntry.objects.count(), 0)
+
+    def _create_post(self, club=None):
+        post = Post.objects.create(author=self.owner, message='Message', club_own=club or self.club)
+        TimelineEntry.fanOut(post)
+        return post
+
+    def _timeline(self, user):
+        return list(TimelineEntry.objects.filter(user=user).order_by('-post_id').values_list('post_id', flat=True))
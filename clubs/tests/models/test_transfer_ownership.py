@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from clubs.models import User, Club, Member
+from clubs.user_types import UserTypes
+
+
+class TransferOwnershipTestCase(TestCase):
+    """Tests of Member.transferOwnership."""
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+        'clubs/tests/fixtures/other_club.json',
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(username='johndoe@example.org')
+        self.user = User.objects.get(username='janedoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.owner, club_membership=self.club)
+
+    def test_transfer_to_officer(self):
+        Member.objects.create(user_type=UserTypes.OFFICER, current_user=self.user, club_membership=self.club)
+        self.assertTrue(Member.transferOwnership(self.user, self.owner, self.club))
+        self.assertEqual(self._user_type(self.user), UserTypes.CLUB_OWNER)
+        self.assertEqual(self._user_type(self.owner), UserTypes.OFFICER)
+
+    def test_transfer_to_member_changes_nothing(self):
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        self.assertFalse(Member.transferOwnership(self.user, self.owner, self.club))
+        self.assertEqual(self._user_type(self.user), UserTypes.MEMBER)
+        self.assertEqual(self._user_type(self.owner), UserTypes.CLUB_OWNER)
+
+    def test_transfer_to_officer_of_other_club_changes_nothing(self):
+        other_club = Club.objects.get(name='Club2')
+        Member.objects.create(user_type=UserTypes.OFFICER, current_user=self.user, club_membership=other_club)
+        self.assertFalse(Member.transferOwnership(self.user, self.owner, self.club))
+        self.assertEqual(self._user_type(self.owner), UserTypes.CLUB_OWNER)
+
+    def test_transfer_by_non_owner_changes_nothing(self):
+        Member.objects.filter(current_user=self.owner).update(user_type=UserTypes.OFFICER)
+        Member.objects.create(user_type=UserTypes.OFFICER, current_user=self.user, club_membership=self.club)
+        self.assertFalse(Member.transferOwnership(self.user, self.owner, self.club))
+        self.assertEqual(self._user_type(self.user), UserTypes.OFFICER)
+
+    def test_transfer_to_oneself_changes_nothing(self):
+        self.assertFalse(Member.transferOwnership(self.owner, self.owner, self.club))
+        self.assertEqual(self._user_type(self.owner), UserTypes.CLUB_OWNER)
+
+    def _user_type(self, user):
+        return Member.objects.get(current_user=user, club_membership=self.club).user_type
+
+
+class ConcurrentTransferOwnershipTestCase(TransactionTestCase):
+    """Transfers racing each other must leave the club with exactly one owner."""
+
+    OFFICER_COUNT = 8
+    ATTEMPTS = 200
+
+    def setUp(self):
+        self.club = Club.objects.create(name='Club', location='London', description='A club.')
+        self.owner = User.objects.create(username='owner@example.org', first_name='Owner', last_name='Owner')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.owner, club_membership=self.club)
+        self.officers = []
+        for index in range(self.OFFICER_COUNT):
+            officer = User.objects.create(username=f'officer{index}@example.org', first_name='Officer', last_name=f'{index}')
+            Member.objects.create(user_type=UserTypes.OFFICER, current_user=officer, club_membership=self.club)
+            self.officers.append(officer)
+
+    def test_concurrent_transfers_leave_one_owner(self):
+        barrier = threading.Barrier(self.OFFICER_COUNT)
+        transferred_to = []
+        errors = []
+
+        def transfer(officer):
+            try:
+                barrier.wait()
+                for _ in range(self.ATTEMPTS):
+                    try:
+                        transferred = Member.transferOwnership(officer, self.owner, self.club)
+                    except OperationalError:
+                        # SQLite refuses concurrent writers rather than queueing them, so the transfer is retried
+                        time.sleep(random.uniform(0, 0.01))
+                        continue
+                    if transferred:
+                        transferred_to.append(officer)
+                    return
+                errors.append(f'The transfer to {officer.username} was locked out {self.ATTEMPTS} times')
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=transfer, args=(officer,)) for officer in self.officers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(transferred_to), 1)
+        owners = list(Member.objects.filter(club_membership=self.club, user_type=UserTypes.CLUB_OWNER).values_list('current_user', flat=True))
+        self.assertEqual(owners, [transferred_to[0].id])
+        self.assertEqual(
+            Member.objects.filter(club_membership=self.club, user_type=UserTypes.OFFICER).count(),
+            self.OFFICER_COUNT,
+        )
@@ -1,6 +1,7 @@
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from clubs.models import User
+from libgravatar import Gravatar
+from clubs.models import User, gravatar_hash
 # Create your tests here.
 
 
@@ -136,6 +137,41 @@ class UserModelTestCase(TestCase):
         self.user.chess_experience = second_user.chess_experience
         self._assert_user_is_valid()
 
+    """Gravatar tests"""
+
+    def test_gravatar_matches_libgravatar(self):
+        expected = Gravatar(self.user.username).get_image(size=60, default='mp')
+        self.assertEqual(self.user.mini_gravatar(), expected)
+
+    def test_avatar_hash_follows_email_changes(self):
+        self.user.email = ' John.Doe@Example.org '
+        self.user.save(update_fields=['email'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar_hash, gravatar_hash('john.doe@example.org'))
+
+    def test_avatar_hash_falls_back_to_username(self):
+        self.user.email = ''
+        self.user.save()
+        self.assertEqual(self.user.avatar_hash, gravatar_hash('johndoe@example.org'))
+
+    def test_avatar_hash_follows_username_changes(self):
+        self.user.email = ''
+        self.user.username = 'john.doe@example.org'
+        self.user.save(update_fields=['username'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.avatar_hash, gravatar_hash('john.doe@example.org'))
+
+    def test_created_users_get_distinct_avatar_hashes(self):
+        first_user = User.objects.create_user('first@example.org', first_name='First', last_name='User', password='Password123')
+        second_user = User.objects.create_user('second@example.org', first_name='Second', last_name='User', password='Password123')
+        self.assertEqual(first_user.avatar_hash, gravatar_hash('first@example.org'))
+        self.assertNotEqual(first_user.avatar_hash, second_user.avatar_hash)
+
+    def test_gravatar_needs_no_email(self):
+        user = User.objects.only('id', 'avatar_hash').get(id=self.user.id)
+        with self.assertNumQueries(0):
+            user.gravatar()
+
     """Extra functions"""
 
     def _assert_user_is_valid(self):
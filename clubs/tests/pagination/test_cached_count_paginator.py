@@ -0,0 +1,52 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from clubs.models import Club
+from clubs.pagination import CachedCountPaginator
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CachedCountPaginatorTestCase(TestCase):
+
+    fixtures = [
+        'clubs/tests/fixtures/club.json',
+        'clubs/tests/fixtures/other_club.json',
+    ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_count_is_served_from_cache(self):
+        self.assertEqual(self._paginator().count, 11)
+        with self.assertNumQueries(0):
+            self.assertEqual(self._paginator().count, 11)
+
+    def test_count_is_cached_per_scope(self):
+        self.assertEqual(self._paginator(count_scope=1).count, 11)
+        with CaptureQueriesContext(connection) as context:
+            self._paginator(count_scope=2).count
+        self.assertTrue(any('COUNT(*)' in query['sql'] for query in context.captured_queries))
+
+    def test_creating_a_club_invalidates_the_count(self):
+        self.assertEqual(self._paginator().count, 11)
+        with self.captureOnCommitCallbacks(execute=True):
+            Club.objects.create(name='New club', location='Location', description='Description')
+        self.assertEqual(self._paginator().count, 12)
+
+    def test_deleting_a_club_invalidates_the_count(self):
+        self.assertEqual(self._paginator().count, 11)
+        with self.captureOnCommitCallbacks(execute=True):
+            Club.objects.get(name='Club').delete()
+        self.assertEqual(self._paginator().count, 10)
+
+    @override_settings(PAGINATOR_ESTIMATE_THRESHOLD=5)
+    def test_count_of_large_unfiltered_table_is_estimated(self):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute("UPDATE sqlite_stat1 SET stat = '5000' WHERE tbl = 'clubs_club'")
+        self.assertEqual(self._paginator().count, 5000)
+        filtered = CachedCountPaginator(Club.objects.filter(location='Location').order_by('id'), 10, count_kind='filtered', count_tables=('club',))
+        self.assertEqual(filtered.count, 1)
+
+    def _paginator(self, count_scope='all'):
+        return CachedCountPaginator(Club.objects.order_by('id'), 10, count_kind='clubs', count_scope=count_scope, count_tables=('club',))
@@ -0,0 +1,48 @@
+"""Test runner of the clubs app."""
+import unittest
+from django.core.cache import caches
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+def _clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+def _test_cases(suite):
+    """Yield the test cases of a suite, however deeply it is nested."""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _test_cases(test)
+        else:
+            yield test
+
+
+class LocMemCacheTestRunner(DiscoverRunner):
+    """Runs the tests against a local memory cache, emptied after every test.
+
+    Views are tested with caching as it runs in production, so their query
+    counts are the real ones, while no cached state leaks between tests,
+    whose rows reuse the ids of earlier tests' rows.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_settings = override_settings(CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }
+        })
+        self.cache_settings.enable()
+        _clear_caches()
+
+    def teardown_test_environment(self, **kwargs):
+        self.cache_settings.disable()
+        super().teardown_test_environment(**kwargs)
+
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        for test in _test_cases(suite):
+            test.addCleanup(_clear_caches)
+        return suite
@@ -0,0 +1,93 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.models import User, Club, Member, Post
+from clubs.snapshots import get_club_snapshot
+from clubs.user_types import UserTypes
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ClubSnapshotTestCase(TestCase):
+    """Tests of the cached club page snapshots."""
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.get(username='johndoe@example.org')
+        self.user = User.objects.get(username='janedoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.createClubOwner(self.owner, self.club)
+        Post.objects.create(author=self.owner, club_own=self.club, message='First post')
+        self.url = reverse('show_club', kwargs={'club_id': self.club.id})
+
+    def test_snapshot_of_club(self):
+        snapshot = get_club_snapshot(self.club.id)
+        self.assertEqual(snapshot.club, self.club)
+        self.assertEqual(snapshot.owner, self.owner)
+        self.assertEqual(snapshot.members_count, 1)
+        self.assertEqual([post.message for post in snapshot.posts], ['First post'])
+        self.assertFalse(snapshot.has_more_posts)
+
+    def test_snapshot_of_missing_club_is_none(self):
+        self.assertIsNone(get_club_snapshot(9999))
+
+    def test_snapshot_is_served_from_cache(self):
+        get_club_snapshot(self.club.id)
+        with self.assertNumQueries(0):
+            get_club_snapshot(self.club.id)
+
+    def test_visitors_share_the_snapshot(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        self.client.get(self.url)
+        self.client.login(username=self.user.username, password='Password123')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertContains(response, 'First post')
+        shared_tables = ('"clubs_club"', '"clubs_post"')
+        self.assertFalse(any(
+            query['sql'].startswith('SELECT') and any(f'FROM {table}' in query['sql'] for table in shared_tables)
+            for query in context.captured_queries
+        ))
+
+    def test_new_post_invalidates_snapshot(self):
+        get_club_snapshot(self.club.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.owner, club_own=self.club, message='Second post')
+        self.assertEqual(get_club_snapshot(self.club.id).posts[0].message, 'Second post')
+
+    def test_snapshot_is_kept_until_the_change_commits(self):
+        get_club_snapshot(self.club.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.club.location = 'Paris'
+            self.club.save()
+            self.assertEqual(get_club_snapshot(self.club.id).club.location, 'Location')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_club_snapshot(self.club.id).club.location, 'Paris')
+
+    def test_club_edit_invalidates_snapshot(self):
+        get_club_snapshot(self.club.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.location = 'Paris'
+            self.club.save()
+        self.assertEqual(get_club_snapshot(self.club.id).club.location, 'Paris')
+
+    def test_membership_change_invalidates_snapshot(self):
+        get_club_snapshot(self.club.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.applyClub(self.user, self.club)
+            Member.acceptApplicant(self.user, self.club)
+        self.assertEqual(get_club_snapshot(self.club.id).members_count, 2)
+
+    def test_ownership_transfer_invalidates_snapshot(self):
+        Member.objects.create(user_type=UserTypes.OFFICER, current_user=self.user, club_membership=self.club)
+        get_club_snapshot(self.club.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.transferOwnership(self.user, self.owner, self.club)
+        self.assertEqual(get_club_snapshot(self.club.id).owner, self.user)
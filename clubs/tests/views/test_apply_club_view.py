@@ -1,5 +1,7 @@
 from django.urls import reverse
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from clubs.models import User, Member, Club
 from clubs.user_types import UserTypes
 
@@ -54,6 +56,22 @@ class ApplyClubViewTestCase(TestCase):
         self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
         self.assertTemplateUsed(response, 'feed.html')
 
+    def test_apply_club_twice_creates_one_application(self):
+        self.client.login(username=self.user.username, password='Password123')
+        self.client.get(self.url)
+        response = self.client.get(self.url, follow=True)
+        self.assertContains(response, f"You&#x27;re already a member of { self.club.name }!!")
+        self.assertEqual(Member.objects.filter(current_user=self.user, club_membership=self.club).count(), 1)
+        self.club.refresh_from_db()
+        self.assertEqual(self.club.applicant_count, 1)
+
+    def test_apply_club_writes_once(self):
+        self.client.login(username=self.user.username, password='Password123')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        inserts = [query for query in context.captured_queries if query['sql'].startswith('INSERT') and 'clubs_member' in query['sql']]
+        self.assertEqual(len(inserts), 1)
+
     def test_apply_to_invalid_club_redirects(self):
         self.client.login(username=self.user.username, password='Password123')
         count_before = Member.objects.count()
@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
 from django.urls import reverse
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from clubs.models import User, Member, Club
 from clubs.user_types import UserTypes
 
@@ -36,4 +40,38 @@ class ApplyViewTestCase(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'apply.html')
-        self.assertEqual(len(response.context['clubs']), 11)
+        self.assertEqual(len(response.context['clubs']), settings.CLUBS_PER_PAGE)
+        self.assertTrue(response.context['is_paginated'])
+        response = self.client.get(self.url + '?page=2')
+        self.assertEqual(len(response.context['clubs']), 11 - settings.CLUBS_PER_PAGE)
+
+    def test_apply_orders_clubs_by_name(self):
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url)
+        names = [club.name for club in response.context['clubs']]
+        self.assertEqual(names, sorted(names))
+
+    def test_apply_excludes_clubs_of_the_user(self):
+        Member.objects.create(
+            user_type=UserTypes.APPLICANT,
+            current_user=self.user,
+            club_membership=self.club
+        )
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url)
+        self.assertNotIn(self.club, response.context['clubs'])
+        self.assertEqual(response.context['paginator'].count, 10)
+
+    def test_apply_query_count_does_not_grow_with_clubs(self):
+        self.client.login(username=self.user.username, password='Password123')
+        with CaptureQueriesContext(connection) as few_clubs:
+            self.client.get(self.url)
+        Club.objects.bulk_create([
+            Club(name=f'Bulk club {club_id}', location='Location', description='Description')
+            for club_id in range(200)
+        ])
+        # The clubs were bulk created behind the cache's back
+        cache.clear()
+        with CaptureQueriesContext(connection) as many_clubs:
+            self.client.get(self.url)
+        self.assertEqual(len(few_clubs), len(many_clubs))
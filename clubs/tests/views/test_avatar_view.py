@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from clubs.avatars import identicon_path, identicon_svg
+from clubs.models import User
+
+
+class AvatarViewTestCase(TestCase):
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+    ]
+
+    def setUp(self):
+        self.avatar_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.avatar_root)
+        settings_override = override_settings(AVATAR_MODE='identicon', AVATAR_ROOT=self.avatar_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.get(username='johndoe@example.org')
+        self.url = reverse('avatar', kwargs={'avatar_hash': self.user.avatar_hash, 'size': 60})
+
+    def test_avatar_url(self):
+        self.assertEqual(self.url, f'/avatars/{self.user.avatar_hash}/60.svg')
+
+    def test_users_link_to_their_identicons(self):
+        self.assertEqual(self.user.mini_gravatar(), self.url)
+
+    def test_users_without_email_get_distinct_identicons(self):
+        other_user = User.objects.get(username='janedoe@example.org')
+        self.assertEqual(self.user.email, '')
+        self.assertEqual(other_user.email, '')
+        self.assertNotEqual(self.user.mini_gravatar(), other_user.mini_gravatar())
+        self.assertNotEqual(identicon_svg(self.user.avatar_hash, 60), identicon_svg(other_user.avatar_hash, 60))
+
+    def test_get_avatar(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertEqual(b''.join(response.streaming_content).decode(), identicon_svg(self.user.avatar_hash, 60))
+        self.assertEqual(response['ETag'], f'"{self.user.avatar_hash}-60"')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_avatar_is_stored_on_first_request(self):
+        path = identicon_path(self.user.avatar_hash, 60)
+        self.assertFalse(os.path.exists(path))
+        self.client.get(self.url)
+        self.assertTrue(os.path.exists(path))
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_identicons_are_deterministic(self):
+        self.assertEqual(identicon_svg(self.user.avatar_hash, 60), identicon_svg(self.user.avatar_hash, 60))
+        self.assertNotEqual(identicon_svg(self.user.avatar_hash, 60), identicon_svg('0' * 32, 60))
+
+    def test_unknown_avatar_hash_is_drawn_without_looking_up_users(self):
+        url = reverse('avatar', kwargs={'avatar_hash': 'f' * 32, 'size': 60})
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content).decode(), identicon_svg('f' * 32, 60))
+
+    def test_unsupported_size_is_not_found(self):
+        url = reverse('avatar', kwargs={'avatar_hash': self.user.avatar_hash, 'size': 61})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_is_not_allowed(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,77 @@
+from django.urls import reverse
+from django.test import TestCase
+from clubs.models import User, Member, Club
+from clubs.user_types import UserTypes
+
+class BulkManageApplicantsViewTestCase(TestCase):
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(username='janedoe@example.org')
+        self.member = User.objects.get(username='alexjordan@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.owner, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.member, club_membership=self.club)
+        User.objects.bulk_create([
+            User(username=f'applicant{user_id}@test.org', first_name='Applicant', last_name=f'{user_id}')
+            for user_id in range(50)
+        ])
+        self.applicants = list(User.objects.filter(username__startswith='applicant'))
+        Member.objects.bulk_create([
+            Member(user_type=UserTypes.APPLICANT, current_user=applicant, club_membership=self.club)
+            for applicant in self.applicants
+        ])
+        # bulk_create does not count the new memberships
+        Club.recountRoles()
+        self.url = reverse('bulk_manage_applicants', kwargs={'club_id': self.club.id})
+
+    def test_bulk_manage_applicants_url(self):
+        self.assertEqual(self.url, f'/bulk_manage_applicants/{self.club.id}')
+
+    def test_bulk_accept_applicants(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        selected = [applicant.id for applicant in self.applicants[:30]]
+        response = self.client.post(self.url, {'action': 'accept', 'user_ids': selected}, follow=True)
+        redirect_url = reverse('manage_applicants', kwargs={'club_id': self.club.id})
+        self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+        self.assertContains(response, '30 application(s) accepted!')
+        self.assertEqual(Member.objects.filter(current_user_id__in=selected, user_type=UserTypes.MEMBER).count(), 30)
+        self.assertEqual(Member.objects.filter(club_membership=self.club, user_type=UserTypes.APPLICANT).count(), 20)
+        self.club.refresh_from_db()
+        self.assertEqual((self.club.applicant_count, self.club.member_count), (20, 31))
+
+    def test_bulk_decline_applicants(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        selected = [applicant.id for applicant in self.applicants[:10]] + [self.member.id]
+        response = self.client.post(self.url, {'action': 'decline', 'user_ids': selected}, follow=True)
+        self.assertContains(response, '10 application(s) declined!')
+        self.assertEqual(Member.objects.filter(club_membership=self.club, user_type=UserTypes.APPLICANT).count(), 40)
+        self.assertTrue(Member.objects.filter(current_user=self.member, user_type=UserTypes.MEMBER).exists())
+
+    def test_bulk_accept_costs_a_constant_number_of_queries(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        selected = [applicant.id for applicant in self.applicants]
+        with self.assertNumQueries(8):
+            self.client.post(self.url, {'action': 'accept', 'user_ids': selected})
+
+    def test_bulk_manage_applicants_without_staff_permission_fails(self):
+        self.client.login(username=self.member.username, password='Password123')
+        selected = [applicant.id for applicant in self.applicants]
+        response = self.client.post(self.url, {'action': 'accept', 'user_ids': selected})
+        self.assertRedirects(response, reverse('show_club', kwargs={'club_id': self.club.id}), status_code=302, target_status_code=200)
+        self.assertEqual(Member.objects.filter(club_membership=self.club, user_type=UserTypes.APPLICANT).count(), 50)
+
+    def test_get_bulk_manage_applicants_is_not_allowed(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 405)
+
+    def test_bulk_manage_applicants_without_login_redirects(self):
+        response = self.client.post(self.url, {'action': 'accept', 'user_ids': [self.applicants[0].id]})
+        self.assertRedirects(response, '/?next=' + self.url, status_code=302, target_status_code=200)
+        self.assertEqual(Member.objects.filter(club_membership=self.club, user_type=UserTypes.APPLICANT).count(), 50)
@@ -0,0 +1,74 @@
+from django.urls import reverse
+from django.test import TestCase
+from clubs.models import User, Member, Club
+from clubs.user_types import UserTypes
+
+class BulkManageMembersViewTestCase(TestCase):
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(username='janedoe@example.org')
+        self.member = User.objects.get(username='johndoe@example.org')
+        self.officer = User.objects.get(username='alexjordan@example.org')
+        self.applicant = User.objects.get(username='anniesmith@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.owner, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.member, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.OFFICER, current_user=self.officer, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.APPLICANT, current_user=self.applicant, club_membership=self.club)
+        self.everyone = [self.owner.id, self.member.id, self.officer.id, self.applicant.id]
+        self.url = reverse('bulk_manage_members', kwargs={'club_id': self.club.id})
+
+    def test_bulk_manage_members_url(self):
+        self.assertEqual(self.url, f'/bulk_manage_members/{self.club.id}')
+
+    def test_bulk_promote_only_promotes_members(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        response = self.client.post(self.url, {'action': 'promote', 'user_ids': self.everyone}, follow=True)
+        redirect_url = reverse('club_members', kwargs={'club_id': self.club.id})
+        self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+        self.assertContains(response, '1 member(s) promoted!')
+        self.assertEqual(self._user_type(self.member), UserTypes.OFFICER)
+        self.assertEqual(self._user_type(self.owner), UserTypes.CLUB_OWNER)
+        self.assertEqual(self._user_type(self.applicant), UserTypes.APPLICANT)
+
+    def test_bulk_demote_only_demotes_officers(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        response = self.client.post(self.url, {'action': 'demote', 'user_ids': self.everyone}, follow=True)
+        self.assertContains(response, '1 officer(s) demoted!')
+        self.assertEqual(self._user_type(self.officer), UserTypes.MEMBER)
+        self.assertEqual(self._user_type(self.owner), UserTypes.CLUB_OWNER)
+
+    def test_bulk_kick_out_never_removes_the_owner_or_applicants(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        response = self.client.post(self.url, {'action': 'kick', 'user_ids': self.everyone}, follow=True)
+        self.assertContains(response, '2 member(s) removed from the club!')
+        self.assertIsNone(self._user_type(self.member))
+        self.assertIsNone(self._user_type(self.officer))
+        self.assertEqual(self._user_type(self.owner), UserTypes.CLUB_OWNER)
+        self.assertEqual(self._user_type(self.applicant), UserTypes.APPLICANT)
+
+    def test_bulk_manage_members_ignores_malformed_ids(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        response = self.client.post(self.url, {'action': 'promote', 'user_ids': ['abc', self.member.id]}, follow=True)
+        self.assertContains(response, '1 member(s) promoted!')
+
+    def test_bulk_manage_members_without_owner_permission_fails(self):
+        self.client.login(username=self.officer.username, password='Password123')
+        response = self.client.post(self.url, {'action': 'kick', 'user_ids': self.everyone})
+        self.assertRedirects(response, reverse('show_club', kwargs={'club_id': self.club.id}), status_code=302, target_status_code=200)
+        self.assertEqual(self._user_type(self.member), UserTypes.MEMBER)
+
+    def test_bulk_manage_members_without_login_redirects(self):
+        response = self.client.post(self.url, {'action': 'kick', 'user_ids': self.everyone})
+        self.assertRedirects(response, '/?next=' + self.url, status_code=302, target_status_code=200)
+        self.assertEqual(Member.objects.filter(club_membership=self.club).count(), 4)
+
+    def _user_type(self, user):
+        membership = Member.objects.filter(current_user=user, club_membership=self.club).first()
+        return membership.user_type if membership else None
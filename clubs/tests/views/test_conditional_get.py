@@ -0,0 +1,141 @@
+from unittest import mock
+from django.contrib import messages
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.models import User, Club, Member, Post
+from clubs.user_types import UserTypes
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ConditionalGetTestCase(TestCase):
+    """Tests of the ETags of the feed, club and club list pages."""
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+        'clubs/tests/fixtures/other_club.json',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(username='johndoe@example.org')
+        self.other_user = User.objects.get(username='janedoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.user, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.other_user, club_membership=self.club)
+        Post.objects.create(author=self.other_user, club_own=self.club, message='Hello club')
+        self.feed_url = reverse('feed')
+        self.show_club_url = reverse('show_club', kwargs={'club_id': self.club.id})
+        self.club_list_url = reverse('club_list')
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_pages_are_private_and_revalidated(self):
+        for url in (self.feed_url, self.show_club_url, self.club_list_url):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.has_header('ETag'))
+            self.assertIn('private', response['Cache-Control'])
+            self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_unchanged_pages_are_not_modified(self):
+        for url in (self.feed_url, self.show_club_url, self.club_list_url):
+            etag = self.client.get(url)['ETag']
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+
+    def test_unchanged_feed_queries_no_posts(self):
+        etag = self.client.get(self.feed_url)['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(any('"clubs_post"' in query['sql'] for query in context.captured_queries))
+
+    def test_new_post_changes_feed_and_club_page(self):
+        feed_etag = self.client.get(self.feed_url)['ETag']
+        club_etag = self.client.get(self.show_club_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.other_user, club_own=self.club, message='Another post')
+        response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=feed_etag)
+        self.assertContains(response, 'Another post')
+        response = self.client.get(self.show_club_url, HTTP_IF_NONE_MATCH=club_etag)
+        self.assertContains(response, 'Another post')
+
+    def test_post_in_other_club_keeps_feed(self):
+        etag = self.client.get(self.feed_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.create(author=self.other_user, club_own=Club.objects.get(name='Club2'), message='Elsewhere')
+        response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_author_profile_edit_changes_feed(self):
+        etag = self.client.get(self.feed_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_user.first_name = 'Janet'
+            self.other_user.save()
+        response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Janet')
+
+    def test_author_profile_edit_changes_club_page(self):
+        etag = self.client.get(self.show_club_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other_user.first_name = 'Janet'
+            self.other_user.save()
+        response = self.client.get(self.show_club_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Janet')
+
+    def test_profile_edit_outside_the_clubs_keeps_pages(self):
+        outsider = User.objects.create_user('outsider@example.org', first_name='Out', last_name='Sider', password='Password123')
+        etags = {url: self.client.get(url)['ETag'] for url in (self.feed_url, self.show_club_url)}
+        with self.captureOnCommitCallbacks(execute=True):
+            outsider.first_name = 'Changed'
+            outsider.save()
+        for url, etag in etags.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+
+    def test_validators_are_read_in_one_round_trip(self):
+        for url in (self.feed_url, self.show_club_url, self.club_list_url):
+            etag = self.client.get(url)['ETag']
+            with mock.patch.object(cache, 'get_many', wraps=cache.get_many) as get_many:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            get_many.assert_called_once()
+
+    def test_new_club_changes_club_list(self):
+        etag = self.client.get(self.club_list_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Club.objects.create(name='A new club', location='London', description='A new club.')
+        response = self.client.get(self.club_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'A new club')
+
+    def test_membership_change_changes_feed(self):
+        etag = self.client.get(self.feed_url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.objects.create(user_type=UserTypes.APPLICANT, current_user=self.user, club_membership=Club.objects.get(name='Club2'))
+        response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_pages_are_per_user(self):
+        etag = self.client.get(self.club_list_url)['ETag']
+        self.client.login(username=self.other_user.username, password='Password123')
+        response = self.client.get(self.club_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_messages_are_shown(self):
+        etag = self.client.get(self.club_list_url)['ETag']
+        storage = CookieStorage(RequestFactory().get('/'))
+        self.client.cookies[storage.cookie_name] = storage._encode([Message(messages.SUCCESS, 'Welcome back')])
+        response = self.client.get(self.club_list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Welcome back')
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_logged_out_users_are_redirected(self):
+        self.client.logout()
+        response = self.client.get(self.feed_url, HTTP_IF_NONE_MATCH='"anything"')
+        self.assertEqual(response.status_code, 302)
@@ -1,6 +1,9 @@
-from django.test import TestCase
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from clubs.models import User, Member, Club
+from clubs.models import User, Member, Club, Post, TimelineEntry
 from clubs.user_types import UserTypes
 
 class FeedViewTestCase(TestCase):
@@ -43,3 +46,86 @@ class FeedViewTestCase(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'feed.html')
         self.assertContains(response, 'Club')
+
+    @override_settings(MATERIALIZED_FEED=True)
+    def test_get_materialized_feed_shows_posts_of_the_users_clubs(self):
+        owner = User.objects.get(username='janedoe@example.org')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=owner, club_membership=self.club)
+        Member.applyClub(self.user, self.club)
+        Member.acceptApplicant(self.user, self.club)
+        self.client.login(username=owner.username, password='Password123')
+        self.client.post(reverse('post_messages', kwargs={'club_id': self.club.id}), {'message': 'Materialized post'})
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Materialized post')
+        self.assertEqual(len(response.context['posts']), 1)
+
+    def test_get_feed_pages_by_post_cursor(self):
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        posts = self._create_posts(settings.POSTS_PER_PAGE*2+3)
+        self._assert_pages_by_post_cursor(posts)
+
+    @override_settings(MATERIALIZED_FEED=True)
+    def test_get_materialized_feed_pages_by_post_cursor(self):
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        posts = self._create_posts(settings.POSTS_PER_PAGE*2+3)
+        TimelineEntry.rebuild()
+        self._assert_pages_by_post_cursor(posts)
+
+    @override_settings(MATERIALIZED_FEED=True)
+    def test_materialized_feed_is_ordered_by_the_timeline(self):
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        posts = self._create_posts(settings.POSTS_PER_PAGE+1)
+        TimelineEntry.rebuild()
+        self.client.login(username=self.user.username, password='Password123')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url + f'?before={posts[0]}')
+        feed_query, = [query['sql'] for query in context.captured_queries if 'clubs_timelineentry' in query['sql']]
+        self.assertIn('"clubs_timelineentry"."post_id" < ', feed_query)
+        self.assertEqual(feed_query.count('JOIN "clubs_timelineentry"'), 1)
+
+    def _assert_pages_by_post_cursor(self, posts):
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url)
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.is_keyset)
+        self.assertEqual([post.id for post in response.context['posts']], posts[:settings.POSTS_PER_PAGE])
+        self.assertFalse(page_obj.has_previous())
+        self.assertContains(response, f'?before={posts[settings.POSTS_PER_PAGE-1]}')
+        response = self.client.get(self.url + f'?before={page_obj.next_cursor}')
+        page_obj = response.context['page_obj']
+        self.assertEqual([post.id for post in response.context['posts']], posts[settings.POSTS_PER_PAGE:settings.POSTS_PER_PAGE*2])
+        self.assertTrue(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+        response = self.client.get(self.url + f'?after={page_obj.previous_cursor}')
+        self.assertEqual([post.id for post in response.context['posts']], posts[:settings.POSTS_PER_PAGE])
+        response = self.client.get(self.url + '?oldest')
+        page_obj = response.context['page_obj']
+        self.assertEqual([post.id for post in response.context['posts']], posts[-settings.POSTS_PER_PAGE:])
+        self.assertFalse(page_obj.has_next())
+
+    def test_get_feed_by_cursor_does_not_count_posts(self):
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        posts = self._create_posts(settings.POSTS_PER_PAGE*3)
+        self.client.login(username=self.user.username, password='Password123')
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url + f'?before={posts[settings.POSTS_PER_PAGE]}')
+        self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+
+    def test_get_feed_with_page_number_still_works(self):
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        self._create_posts(settings.POSTS_PER_PAGE+1)
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url + '?page=2')
+        self.assertEqual(len(response.context['posts']), 1)
+        self.assertEqual(response.context['page_obj'].number, 2)
+
+    def _create_posts(self, post_count):
+        """Create posts in the club and return their ids, newest first."""
+        author = User.objects.get(username='janedoe@example.org')
+        Post.objects.bulk_create([
+            Post(author=author, message=f'Post {post_id}', club_own=self.club)
+            for post_id in range(post_count)
+        ])
+        return list(Post.objects.filter(club_own=self.club).order_by('-id').values_list('id', flat=True))
@@ -46,6 +46,15 @@ class TestMakeOwnerViewTestCase(TestCase):
         self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
         self.assertTemplateUsed(response, 'show_club.html')
 
+    def test_make_owner_of_non_officer_fails(self):
+        self.client.login(username=self.owner.username, password='Password123')
+        Member.objects.filter(current_user=self.officer).update(user_type=UserTypes.MEMBER)
+        response = self.client.get(self.url, follow=True)
+        redirect_url = reverse('manage_officers', kwargs={'club_id': self.club.id})
+        self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+        self.assertContains(response, 'Ownership can only be given to an officer of the club!')
+        self.assertTrue(Member.objects.filter(current_user=self.owner, user_type=UserTypes.CLUB_OWNER).exists())
+
     def test_get_make_owner_without_login(self):
         officer_count_before = Member.objects.filter(user_type=UserTypes.OFFICER).count()
         response = self.client.get(self.url, follow=True)
@@ -1,4 +1,6 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.conf import settings
 from clubs.models import User, Member, Club
@@ -77,6 +79,56 @@ class MemberListViewTest(TestCase):
         self.assertTrue(page_obj.has_previous())
         self.assertFalse(page_obj.has_next())
 
+    def test_get_member_list_with_keyset_pagination(self):
+        self.client.login(username=self.user.username, password='Password123')
+        self._create_test_members_and_memberships(settings.MEMBERS_PER_PAGE*2+3-1)
+        response = self.client.get(self.url)
+        page_obj = response.context['page_obj']
+        self.assertTrue(page_obj.is_keyset)
+        self.assertFalse(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+        seen = [user.id for user in response.context['members']]
+        response = self.client.get(self.url + f'?after={page_obj.next_cursor}')
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(response.context['members']), settings.MEMBERS_PER_PAGE)
+        self.assertTrue(page_obj.has_previous())
+        self.assertTrue(page_obj.has_next())
+        second_page = [user.id for user in response.context['members']]
+        seen += second_page
+        response = self.client.get(self.url + f'?after={page_obj.next_cursor}')
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(response.context['members']), 3)
+        self.assertFalse(page_obj.has_next())
+        seen += [user.id for user in response.context['members']]
+        self.assertEqual(len(set(seen)), settings.MEMBERS_PER_PAGE*2+3)
+        response = self.client.get(self.url + f'?before={page_obj.previous_cursor}')
+        self.assertEqual([user.id for user in response.context['members']], second_page)
+
+    def test_get_member_list_excludes_applicants(self):
+        applicant = User.objects.get(username='janedoe@example.org')
+        Member.objects.create(
+            user_type=UserTypes.APPLICANT,
+            current_user=applicant,
+            club_membership=self.club
+        )
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url)
+        self.assertNotIn(applicant, response.context['members'])
+        self.assertIn(self.user, response.context['members'])
+
+    def test_get_member_list_query_count_does_not_grow_with_members(self):
+        self.client.login(username=self.user.username, password='Password123')
+        self._bulk_create_members(10)
+        cursor = User.objects.get(username='bulk0@test.org').id
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.get(self.url + f'?after={cursor}')
+        self.assertEqual(len(response.context['members']), settings.MEMBERS_PER_PAGE)
+        self._bulk_create_members(500, start=10)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(self.url + f'?after={cursor}')
+        self.assertEqual(len(response.context['members']), settings.MEMBERS_PER_PAGE)
+        self.assertEqual(len(small), len(large))
+
     def test_get_member_list_redirects_when_not_logged_in(self):
         response = self.client.get(self.url, follow=True)
         redirect_url = reverse_with_next('home', self.url)
@@ -99,3 +151,13 @@ class MemberListViewTest(TestCase):
                 current_user=User.objects.get(username=f'user{user_id}@test.org'),
                 club_membership=self.club
             )
+
+    def _bulk_create_members(self, user_count, start=0):
+        User.objects.bulk_create([
+            User(username=f'bulk{user_id}@test.org', first_name=f'Bulk{user_id}', last_name='Member')
+            for user_id in range(start, start + user_count)
+        ])
+        Member.objects.bulk_create([
+            Member(user_type=UserTypes.MEMBER, current_user=user, club_membership=self.club)
+            for user in User.objects.filter(username__startswith='bulk', member__isnull=True)
+        ])
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from clubs.models import User, Club, Member, Post
+from clubs.user_types import UserTypes
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PostRowCacheTestCase(TestCase):
+    """Tests of the cached_post_rows template tag."""
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.get(username='johndoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.user, club_membership=self.club)
+        self.post = Post.objects.create(author=self.user, club_own=self.club, message='Hello club')
+        self.template = Template('{% load post_rows %}{% cached_post_rows posts %}')
+
+    def test_rows_show_an_absolute_time_made_relative_by_the_browser(self):
+        html = self._render()
+        self.assertIn('Hello club', html)
+        self.assertIn(f'<time class="relative-time" datetime="{self.post.created_at.isoformat()}">', html)
+
+    def test_rendered_rows_are_reused(self):
+        self._render()
+        Post.objects.filter(id=self.post.id).update(message='Changed behind the cache')
+        self.assertIn('Hello club', self._render())
+
+    def test_profile_edit_renders_row_again(self):
+        self._render()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = 'Johnny'
+            self.user.save()
+        self.assertIn('Johnny', self._render())
+
+    def test_logging_in_keeps_rendered_rows(self):
+        self._render()
+        Post.objects.filter(id=self.post.id).update(message='Changed behind the cache')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(self.client.login(username=self.user.username, password='Password123'))
+        self.assertIn('Hello club', self._render())
+
+    def test_club_edit_renders_row_again(self):
+        self._render()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.name = 'Renamed club'
+            self.club.save()
+        self.assertIn('Renamed club', self._render())
+
+    def test_membership_changes_keep_rendered_rows(self):
+        self._render()
+        Post.objects.filter(id=self.post.id).update(message='Changed behind the cache')
+        other_user = User.objects.get(username='janedoe@example.org')
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.applyClub(other_user, self.club)
+            Member.acceptApplicant(other_user, self.club)
+            Member.kickOutMember(other_user, self.club)
+        self.assertIn('Hello club', self._render())
+
+    def _render(self):
+        posts = Post.objects.select_related('author', 'club_own').filter(id=self.post.id)
+        return self.template.render(Context({'posts': posts}))
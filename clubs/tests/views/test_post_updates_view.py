@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from clubs.models import User, Member, Club, Post
+from clubs.user_types import UserTypes
+
+@override_settings(POSTS_PER_PAGE=2)
+class PostUpdatesViewTestCase(TestCase):
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+        'clubs/tests/fixtures/other_club.json',
+    ]
+
+    def setUp(self):
+        self.url = reverse('post_updates')
+        self.user = User.objects.get(username='johndoe@example.org')
+        self.owner = User.objects.get(username='janedoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        self.other_club = Club.objects.get(name='Club2')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.owner, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.owner, club_membership=self.other_club)
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.user, club_membership=self.club)
+        self.first_post = Post.objects.create(author=self.owner, club_own=self.club, message='First post')
+        self.client.login(username=self.user.username, password='Password123')
+
+    def test_post_updates_url(self):
+        self.assertEqual(self.url, '/posts/updates/')
+
+    def test_get_new_feed_posts(self):
+        new_post = Post.objects.create(author=self.owner, club_own=self.club, message='New post')
+        Post.objects.create(author=self.owner, club_own=self.other_club, message='Post elsewhere')
+        updates = self.client.get(self.url, {'after': self.first_post.id}).json()
+        self.assertIn('New post', updates['rows'])
+        self.assertNotIn('First post', updates['rows'])
+        self.assertNotIn('Post elsewhere', updates['rows'])
+        self.assertEqual(updates['last_id'], new_post.id)
+        self.assertFalse(updates['has_more'])
+
+    def test_get_new_club_posts(self):
+        new_post = Post.objects.create(author=self.owner, club_own=self.other_club, message='Post elsewhere')
+        updates = self.client.get(self.url, {'after': self.first_post.id, 'club': self.other_club.id}).json()
+        self.assertIn('Post elsewhere', updates['rows'])
+        self.assertEqual(updates['last_id'], new_post.id)
+
+    def test_no_new_posts_is_answered_empty(self):
+        updates = self.client.get(self.url, {'after': self.first_post.id}).json()
+        self.assertEqual(updates, {'rows': '', 'last_id': self.first_post.id, 'has_more': False})
+
+    def test_too_many_new_posts_has_more(self):
+        for index in range(3):
+            Post.objects.create(author=self.owner, club_own=self.club, message=f'New post {index}')
+        updates = self.client.get(self.url, {'after': self.first_post.id}).json()
+        self.assertTrue(updates['has_more'])
+        self.assertIn('New post 2', updates['rows'])
+        self.assertNotIn('New post 0', updates['rows'])
+
+    def test_invalid_after_is_bad_request(self):
+        response = self.client.get(self.url, {'after': 'latest'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_post_updates_redirects_when_not_logged_in(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_feed_polls_for_new_posts_on_first_page(self):
+        response = self.client.get(reverse('feed'))
+        self.assertContains(response, f'data-after="{self.first_post.id}"')
+        self.assertContains(response, 'js/live_posts.js')
+        self.assertContains(response, f'data-interval="{settings.POST_UPDATES_INTERVAL}"')
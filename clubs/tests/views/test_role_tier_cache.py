@@ -0,0 +1,75 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.helpers import CSRF_TOKEN_PLACEHOLDER
+from clubs.models import User, Club, Member, Post
+from clubs.user_types import UserTypes
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class RoleTierCacheTestCase(TestCase):
+    """Tests of the club page content cached per role tier."""
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/other_user.json',
+        'clubs/tests/fixtures/club.json',
+    ]
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.get(username='johndoe@example.org')
+        self.member = User.objects.get(username='janedoe@example.org')
+        self.other_member = User.objects.get(username='alexjordan@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.objects.create(user_type=UserTypes.CLUB_OWNER, current_user=self.owner, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.member, club_membership=self.club)
+        Member.objects.create(user_type=UserTypes.MEMBER, current_user=self.other_member, club_membership=self.club)
+        Post.objects.create(author=self.owner, club_own=self.club, message='Hello club')
+        self.show_club_url = reverse('show_club', kwargs={'club_id': self.club.id})
+        self.club_members_url = reverse('club_members', kwargs={'club_id': self.club.id})
+
+    def test_members_share_the_rendered_club_page(self):
+        self._get(self.member, self.show_club_url)
+        with CaptureQueriesContext(connection) as context:
+            response = self._get(self.other_member, self.show_club_url)
+        self.assertContains(response, 'Hello club')
+        self.assertContains(response, 'Club members')
+        self.assertFalse(any('"clubs_post"' in query['sql'] for query in context.captured_queries))
+
+    def test_tiers_get_their_own_content(self):
+        self._get(self.member, self.show_club_url)
+        response = self._get(self.owner, self.show_club_url)
+        self.assertContains(response, 'Manage club')
+        response = self._get(self.other_member, self.show_club_url)
+        self.assertNotContains(response, 'Manage club')
+
+    def test_navbar_is_rendered_for_each_user(self):
+        self._get(self.member, self.show_club_url)
+        response = self._get(self.other_member, self.show_club_url)
+        self.assertContains(response, reverse('show_user', kwargs={'user_id': self.other_member.id}))
+
+    def test_promotion_invalidates_content(self):
+        self._get(self.member, self.club_members_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.promoteMember(self.other_member, self.club)
+        response = self._get(self.member, self.club_members_url)
+        self.assertContains(response, 'link-warning')
+
+    def test_cached_form_gets_the_requests_csrf_token(self):
+        self._get(self.owner, self.club_members_url)
+        self.client.logout()
+        response = self._get(self.owner, self.club_members_url)
+        self.assertNotContains(response, CSRF_TOKEN_PLACEHOLDER)
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+
+    def test_pages_with_parameters_are_not_served_from_cache(self):
+        self._get(self.member, self.show_club_url)
+        with CaptureQueriesContext(connection) as context:
+            self._get(self.other_member, self.show_club_url + '?oldest')
+        self.assertTrue(any('"clubs_post"' in query['sql'] for query in context.captured_queries))
+
+    def _get(self, user, url):
+        self.client.force_login(user)
+        return self.client.get(url)
@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.test import TestCase
 from django.urls import reverse
-from clubs.models import User, Club, Member
+from clubs.models import User, Club, Member, Post
 from clubs.tests.helpers import reverse_with_next
 from clubs.user_types import UserTypes
 
@@ -54,3 +55,26 @@ class ShowClubViewTest(TestCase):
         redirect_url = reverse_with_next('home', self.url)
         response = self.client.get(self.url)
         self.assertRedirects(response, redirect_url, status_code=302, target_status_code=200)
+
+    def test_get_show_club_pages_by_post_cursor(self):
+        Post.objects.bulk_create([
+            Post(author=self.user, message=f'Post {post_id}', club_own=self.club)
+            for post_id in range(settings.POSTS_PER_PAGE+2)
+        ])
+        posts = list(Post.objects.order_by('-id').values_list('id', flat=True))
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url)
+        page = response.context['page']
+        self.assertTrue(page.is_keyset)
+        self.assertEqual([post.id for post in page], posts[:settings.POSTS_PER_PAGE])
+        self.assertContains(response, f'?before={page.next_cursor}')
+        response = self.client.get(self.url + f'?before={page.next_cursor}')
+        page = response.context['page']
+        self.assertEqual([post.id for post in page], posts[settings.POSTS_PER_PAGE:])
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_get_show_club_with_page_number_still_works(self):
+        self.client.login(username=self.user.username, password='Password123')
+        response = self.client.get(self.url + '?page=1')
+        self.assertEqual(response.context['page'].number, 1)
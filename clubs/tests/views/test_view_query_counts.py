@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from clubs.models import User, Club, Member, Post, TimelineEntry
+from clubs.user_types import UserTypes
+
+# The number of rows each list is measured at
+ROW_COUNTS = (1, 10, 1000)
+
+
+class ViewQueryCountTest(TestCase):
+    """Every list view must issue the same number of queries however long the list is."""
+
+    fixtures = [
+        'clubs/tests/fixtures/user.json',
+        'clubs/tests/fixtures/club.json',
+    ]
+
+    def setUp(self):
+        self.owner = User.objects.get(username='johndoe@example.org')
+        self.club = Club.objects.get(name='Club')
+        Member.objects.create(
+            user_type = UserTypes.CLUB_OWNER,
+            current_user=self.owner,
+            club_membership=self.club,
+        )
+        self.client.login(username=self.owner.username, password='Password123')
+
+    def _create_users(self, start, stop):
+        User.objects.bulk_create([
+            User(
+                username=f'user{index}@example.org',
+                email=f'user{index}@example.org',
+                first_name=f'First{index}',
+                last_name=f'Last{index}',
+            )
+            for index in range(start, stop)
+        ])
+        # Primary keys are not set by bulk_create on every backend
+        usernames = [f'user{index}@example.org' for index in range(start, stop)]
+        return list(User.objects.filter(username__in=usernames).order_by('id'))
+
+    def _create_memberships(self, user_type):
+        def create(start, stop):
+            Member.objects.bulk_create([
+                Member(user_type=user_type, current_user=user, club_membership=self.club)
+                for user in self._create_users(start, stop)
+            ])
+        return create
+
+    def _create_posts(self, start, stop):
+        Post.objects.bulk_create([
+            Post(author=author, club_own=self.club, message=f'Post {index}')
+            for index, author in enumerate(self._create_users(start, stop), start)
+        ])
+        TimelineEntry.rebuild()
+
+    def _create_clubs(self, start, stop):
+        names = [f'Club {index}' for index in range(start, stop)]
+        Club.objects.bulk_create([
+            Club(name=name, location='London', description='A club.') for name in names
+        ])
+        return list(Club.objects.filter(name__in=names))
+
+    def _join_clubs(self, start, stop):
+        Member.objects.bulk_create([
+            Member(user_type=UserTypes.MEMBER, current_user=self.owner, club_membership=club)
+            for club in self._create_clubs(start, stop)
+        ])
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def _assert_constant_query_count(self, url, create_rows):
+        """Check the view's query counts with a cold and a warm cache stay the same as rows are added."""
+        cold_counts = []
+        warm_counts = []
+        created = 0
+        for row_count in ROW_COUNTS:
+            create_rows(created, row_count)
+            created = row_count
+            # Rows were bulk created behind the cache's back
+            cache.clear()
+            cold_counts.append(self._count_queries(url))
+            warm_counts.append(self._count_queries(url))
+        self.assertEqual(len(set(cold_counts)), 1, f'Cold cache query counts grew with the rows: {cold_counts}')
+        self.assertEqual(len(set(warm_counts)), 1, f'Warm cache query counts grew with the rows: {warm_counts}')
+        self.assertLessEqual(warm_counts[0], cold_counts[0])
+
+    def test_feed_view(self):
+        self._assert_constant_query_count(reverse('feed'), self._create_posts)
+
+    @override_settings(MATERIALIZED_FEED=True)
+    def test_materialized_feed_view(self):
+        self._assert_constant_query_count(reverse('feed'), self._create_posts)
+
+    def test_show_club_view(self):
+        url = reverse('show_club', kwargs={'club_id': self.club.id})
+        self._assert_constant_query_count(url, self._create_posts)
+
+    def test_show_club_view_with_page_numbers(self):
+        url = reverse('show_club', kwargs={'club_id': self.club.id}) + '?page=1'
+        self._assert_constant_query_count(url, self._create_posts)
+
+    def test_club_members_view(self):
+        url = reverse('club_members', kwargs={'club_id': self.club.id})
+        self._assert_constant_query_count(url, self._create_memberships(UserTypes.MEMBER))
+
+    def test_manage_applicants_view(self):
+        url = reverse('manage_applicants', kwargs={'club_id': self.club.id})
+        self._assert_constant_query_count(url, self._create_memberships(UserTypes.APPLICANT))
+
+    def test_manage_officers_view(self):
+        url = reverse('manage_officers', kwargs={'club_id': self.club.id})
+        self._assert_constant_query_count(url, self._create_memberships(UserTypes.OFFICER))
+
+    def test_member_list_view(self):
+        self._assert_constant_query_count(reverse('member_list'), self._create_memberships(UserTypes.MEMBER))
+
+    def test_club_list_view(self):
+        self._assert_constant_query_count(reverse('club_list'), self._create_clubs)
+
+    def test_apply_view(self):
+        self._assert_constant_query_count(reverse('apply'), self._create_clubs)
+
+    def test_navbar_clubs(self):
+        self._assert_constant_query_count(reverse('create_club'), self._join_clubs)
@@ -6,4 +6,5 @@ from .account_views import *
 from .club_views import *
 from .authentication_view import *
 from .feed_views import *
-from .user_view import *
\ No newline at end of file
+from .user_view import *
+from .avatar_views import *
\ No newline at end of file
@@ -8,7 +8,6 @@ from django.contrib import messages
 from django.urls import reverse
 from clubs.forms import PasswordChangingForm, UserProfileEditingForm, SignUpForm, ClubProfileEditingForm
 from django.contrib.auth.decorators import login_required
-from clubs.models import Member, Club
 from clubs.helpers import club_owner_required
 from .mixins import LoginProhibitedMixin
 
@@ -16,7 +15,6 @@ from .mixins import LoginProhibitedMixin
 def password(request):
     """View to handle password change requests."""
     current_user = request.user
-    members = Member.objects.filter(current_user = current_user)
     if request.method == 'POST':
         form = PasswordChangingForm(data=request.POST)
         if form.is_valid():
@@ -31,13 +29,12 @@ def password(request):
         else:
             messages.add_message(request, messages.ERROR, "Please check your input!")
     form = PasswordChangingForm()
-    return render(request, 'password.html', {'form': form, 'myclubs':members})
+    return render(request, 'password.html', {'form': form})
 
 @login_required
 def edit_profile(request):
     """View to update logged-in user's profile."""
     current_user = request.user
-    members = Member.objects.filter(current_user = current_user)
     if request.method == 'POST':
         form = UserProfileEditingForm(instance=current_user, data=request.POST)
         if form.is_valid():
@@ -46,7 +43,7 @@ def edit_profile(request):
             return redirect('feed')
     else:
         form = UserProfileEditingForm(instance=current_user)
-    return render(request, 'edit_profile.html', {'form': form, 'myclubs':members})
+    return render(request, 'edit_profile.html', {'form': form})
     
 class SignUpView(LoginProhibitedMixin, FormView):
     """View that signs up user."""
@@ -67,9 +64,7 @@ class SignUpView(LoginProhibitedMixin, FormView):
 @club_owner_required
 def edit_club(request, club_id):
     """View to update club profile."""
-    current_user = request.user
-    members = Member.objects.filter(current_user = current_user)
-    club = Club.objects.get(id = club_id)
+    club = request.memberships.get(club_id).club_membership
     if request.method == 'POST':
         form = ClubProfileEditingForm(instance=club, data=request.POST)
         if form.is_valid():
@@ -78,4 +73,4 @@ def edit_club(request, club_id):
             return redirect('feed')
     else:
         form = ClubProfileEditingForm(instance=club)
-    return render(request, 'edit_club.html', {'form': form, 'club': club, 'myclubs':members})
\ No newline at end of file
+    return render(request, 'edit_club.html', {'form': form, 'club': club})
\ No newline at end of file
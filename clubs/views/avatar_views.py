@@ -0,0 +1,30 @@
+"""Avatar related views."""
+import os
+from django.conf import settings
+from django.http import FileResponse, Http404
+from django.utils.cache import get_conditional_response
+from django.views.decorators.http import require_safe
+from clubs.avatars import identicon_path, store_identicon
+
+
+@require_safe
+def avatar(request, avatar_hash, size):
+    """View that serves the identicon of an avatar hash, drawing it on the first request.
+
+    Any hash is drawn, as refusing hashes no user has would tell whoever
+    asks whether an email address is registered.
+    """
+    size = int(size)
+    if size not in settings.AVATAR_SIZES:
+        raise Http404
+    # The hash and size determine the image, so it can be cached forever
+    etag = f'"{avatar_hash}-{size}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        path = identicon_path(avatar_hash, size)
+        if not os.path.exists(path):
+            path = store_identicon(avatar_hash, size)
+        response = FileResponse(open(path, 'rb'), content_type='image/svg+xml')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
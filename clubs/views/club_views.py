@@ -2,55 +2,55 @@
 from django.conf import settings
 from django.contrib.auth import decorators
 from django.shortcuts import render, redirect
+from django.template.response import TemplateResponse
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ObjectDoesNotExist
 from django.contrib import messages
 from django.shortcuts import redirect, render
 from clubs.forms import ClubCreationForm
-from clubs.helpers import valid_user_required
+from clubs.helpers import conditional_page, role_tier_cached, valid_user_required
 from django.contrib.auth.decorators import login_required
 from clubs.models import Member, Club,Post
 from clubs.user_types import UserTypes
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
 from django.utils.decorators import method_decorator
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage,InvalidPage
+from django.core.paginator import PageNotAnInteger, EmptyPage,InvalidPage
+from clubs.pagination import CachedCountPaginator, KeysetPage, KeysetPaginator, keyset_page
+from clubs.snapshots import club_posts, get_club_snapshot
+from .mixins import CachedCountMixin
 
 
+def show_club_versions(request, club_id):
+    """Return what a club page shows: the club with its people's profiles, and its posts."""
+    return [('club', club_id), ('club_posts', club_id)]
+
 
 @login_required
+@conditional_page(show_club_versions)
+@role_tier_cached('show_club.html', 'partials/show_club_content.html')
 def show_club(request, club_id):
     """View that shows individual club details."""
-    try:
-        club = Club.objects.get(id=club_id)
-        members = Member.objects.filter(
-            Q(user_type = UserTypes.MEMBER, club_membership=club) |
-            Q(user_type = UserTypes.OFFICER, club_membership=club) |
-            Q(user_type = UserTypes.CLUB_OWNER, club_membership=club)
-        )
-        club_members = members.count()
-        posts = Post.objects.filter(club_own_id=club_id).order_by('-id')
-    except ObjectDoesNotExist:
+    snapshot = get_club_snapshot(club_id)
+    if snapshot is None:
         return redirect('club_list')
-    else:
-        user = request.user
-        myclubs = Member.objects.filter(current_user = user)
-        user_type = None
-        try:
-            club_owner = Member.objects.get(Q(user_type = UserTypes.CLUB_OWNER, club_membership=club))
-            user_membership = Member.objects.get(current_user = user, club_membership = club)
-            user_type = user_membership.user_type
-        except ObjectDoesNotExist:
-            pass
-        club_owner = Member.objects.get(Q(user_type = UserTypes.CLUB_OWNER, club_membership=club))
-        user = club_owner.current_user
-        paginator = Paginator(posts, 10)
+    club = snapshot.club
+    user_type = request.memberships.user_type(club_id)
+    if 'page' in request.GET:
+        paginator = CachedCountPaginator(club_posts(club.id), settings.POSTS_PER_PAGE, count_kind='club_posts', count_scope=club.id, count_tables=('post',))
         try:
             page_number = request.GET.get('page', '1')
             page = paginator.page(page_number)
         except (PageNotAnInteger, EmptyPage, InvalidPage):
             page = paginator.page(1)
-        return render(request, 'show_club.html', {'club': club, 'user_type': user_type, 'user':user, 'club_members': club_members, 'myclubs': myclubs, 'page':page})
+    elif any(param in request.GET for param in ('before', 'after', 'oldest')):
+        paginator = KeysetPaginator(club_posts(club.id), settings.POSTS_PER_PAGE, ('-id',))
+        page = keyset_page(paginator, request.GET, next_param='before', previous_param='after', last_param='oldest')
+    else:
+        # The first page of posts is part of the snapshot
+        page = KeysetPage(snapshot.posts, snapshot.has_more_posts, False)
+    return TemplateResponse(request, 'show_club.html', {'club': club, 'user_type': user_type, 'user': snapshot.owner, 'club_members': snapshot.members_count, 'page':page})
 
 
 
@@ -58,53 +58,55 @@ def show_club(request, club_id):
 def create_club(request):
     """View that creates club."""
     user = request.user
-    members = Member.objects.filter(current_user = user)
     if request.method == 'POST':
         form = ClubCreationForm(request.POST)
         if form.is_valid():
-            club = form.save()
-            Member.objects.create(
-                user_type=UserTypes.CLUB_OWNER,
-                current_user=user,
-                club_membership=club
-            )
+            with transaction.atomic():
+                club = form.save()
+                Member.createClubOwner(user, club)
             messages.add_message(request, messages.SUCCESS, "Club was created successfully!")
             return redirect('feed')
         return redirect('create_club')
     else:
         form = ClubCreationForm()
-    return render(request, 'create_club.html', {'form': form, 'myclubs': members})
+    return render(request, 'create_club.html', {'form': form})
 
 
-class ClubListView(LoginRequiredMixin, ListView):
+def club_list_versions(request):
+    """Return the clubs table, which the club list shows."""
+    return [('table', 'club')]
+
+
+@method_decorator(conditional_page(club_list_versions), name='dispatch')
+class ClubListView(LoginRequiredMixin, CachedCountMixin, ListView):
     """View that shows a list of all clubs."""
 
     model = Club
     template_name = "club_list.html"
     context_object_name = "clubs"
     paginate_by = settings.CLUBS_PER_PAGE
+    count_kind = 'clubs'
+    count_tables = ('club',)
 
     def get_queryset(self):
-        """Return all clubs."""
-        return Club.objects.all()
+        """Return all clubs, by name."""
+        return Club.objects.order_by('name')
 
-    def get_context_data(self, **kwargs):
-        """Return context data, including new post form."""
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
-        context['myclubs'] = Member.objects.filter(current_user = user)
-        return context
+class ApplyView(LoginRequiredMixin, CachedCountMixin, ListView):
+    """View that shows all clubs the user is not a member of."""
 
-@login_required
-def apply(request):
-    """View that shows all clubs your not a member of"""
-    user = request.user
-    members = Member.objects.filter(current_user = user)
-    clubset = set()
-    clubs = Club.objects.all()
-    for club in clubs:
-        try:
-            Member.objects.get(current_user=user, club_membership=club)
-        except ObjectDoesNotExist:
-            clubset.add(club)
-    return render(request, 'apply.html', {'clubs': clubset, 'myclubs':members})
\ No newline at end of file
+    model = Club
+    template_name = "apply.html"
+    context_object_name = "clubs"
+    paginate_by = settings.CLUBS_PER_PAGE
+    count_kind = 'apply'
+    count_tables = ('club', 'member')
+
+    def get_count_scope(self):
+        """Each user is offered different clubs."""
+        return self.request.user.id
+
+    def get_queryset(self):
+        """Return the clubs the user has no membership or application in, by name."""
+        memberships = Member.objects.filter(club_membership=OuterRef('pk'), current_user=self.request.user)
+        return Club.objects.filter(~Exists(memberships)).order_by('name')
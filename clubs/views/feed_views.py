@@ -1,11 +1,51 @@
 """Feed related views."""
 from django.conf import settings
+from django.db.models import F
 from django.views.generic import ListView
 from django.contrib.auth.mixins import LoginRequiredMixin
-from clubs.models import Member, Club,Post
+from django.utils.decorators import method_decorator
+from clubs.helpers import conditional_page
+from clubs.models import Post
+from clubs.user_types import UserTypes
+from .mixins import CachedCountMixin, KeysetPaginationMixin
 
+# User types whose clubs' posts are in the feed
+FEED_USER_TYPES = (UserTypes.MEMBER, UserTypes.OFFICER, UserTypes.CLUB_OWNER)
 
-class FeedView(LoginRequiredMixin, ListView):
+
+def feed_versions(request):
+    """Return what the user's feed shows: the user's clubs with their people's profiles, and their posts.
+
+    The clubs come from the user's memberships, which the navbar loads
+    anyway, so a feed that has not changed costs no query of posts.
+    """
+    club_ids = sorted(member.club_membership_id for member in request.memberships.myclubs if member.user_type in FEED_USER_TYPES)
+    return [pair for club_id in club_ids for pair in (('club', club_id), ('club_posts', club_id))]
+
+
+def feed_posts(user):
+    """Return the posts of the user's clubs, newest first, with what their rows show.
+
+    Pages are sought and ordered by feed_id, which is the post id.
+    """
+    if settings.MATERIALIZED_FEED:
+        # Read from the timeline's (user, post) index, so a page is one range of it, in order
+        posts = Post.objects.filter(timeline_entries__user=user).annotate(feed_id=F('timeline_entries__post_id'))
+    else:
+        # Joining through the user's memberships lets each club's posts be read from the
+        # (club_own, -id) index instead of scanning every post for ones in the user's clubs
+        posts = Post.objects.filter(
+            club_own__member__current_user=user,
+            club_own__member__user_type__in=FEED_USER_TYPES,
+        ).annotate(feed_id=F('id'))
+    # Each row shows its author and club
+    return posts.select_related('author', 'club_own').defer(
+        'author__bio', 'author__personal_statement'
+    ).order_by('-feed_id')
+
+
+@method_decorator(conditional_page(feed_versions), name='dispatch')
+class FeedView(LoginRequiredMixin, KeysetPaginationMixin, CachedCountMixin, ListView):
     """Class-based generic view for displaying a view."""
 
     login_url = '/?next=/feed/'
@@ -13,22 +53,26 @@ class FeedView(LoginRequiredMixin, ListView):
     template_name = "feed.html"
     context_object_name = 'posts'
     paginate_by = settings.POSTS_PER_PAGE
-    
+    # Older posts are requested with ?before=<post id>, newer ones with ?after=<post id>
+    keyset_ordering = ('-feed_id',)
+    keyset_pk_aliases = ('feed_id',)
+    keyset_next_param = 'before'
+    keyset_previous_param = 'after'
+    keyset_last_param = 'oldest'
+    count_kind = 'feed'
+    count_tables = ('post', 'member')
 
     def get_queryset(self):
         """Return the user's feed."""
-        user = self.request.user
-        clubs = Club.objects.filter(
-        id__in=Member.objects.filter(
-            current_user=user).exclude(user_type = 4).values("club_membership")
-        ).values("id")
-        posts = Post.objects.filter(club_own_id__in=clubs).order_by('-id')
-        return posts
+        return feed_posts(self.request.user)
+
+    def get_count_scope(self):
+        """Each user has their own feed."""
+        return self.request.user.id
 
     def get_context_data(self, **kwargs):
-        """Return context data, including myclubs and user."""
+        """Return context data, including user."""
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        context['user'] = user
-        context['myclubs'] = Member.objects.filter(current_user = user)
+        context['user'] = self.request.user
+        context['post_updates_interval'] = settings.POST_UPDATES_INTERVAL
         return context
@@ -3,16 +3,16 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
 from clubs.models import User, Member, Club
 from clubs.helpers import club_owner_required, staff_required, valid_user_required
-from django.core.exceptions import ObjectDoesNotExist
 
 @login_required
 @valid_user_required
 @club_owner_required
 def promote_member(request, club_id, user_id):
     """View that promotes a member to an officer"""
-    club = Club.objects.get(id = club_id)
+    club = request.memberships.get(club_id).club_membership
     user = User.objects.get(id = user_id)
     Member.promoteMember(user, club)
     messages.add_message(request, messages.SUCCESS, "Member was promoted successfully!")
@@ -23,7 +23,7 @@ def promote_member(request, club_id, user_id):
 @club_owner_required
 def kickout_member(request, club_id, user_id):
     """View that kicks a member out"""
-    club = Club.objects.get(id = club_id)
+    club = request.memberships.get(club_id).club_membership
     user = User.objects.get(id = user_id)
     Member.kickOutMember(user, club)
     messages.add_message(request, messages.SUCCESS, "Member was removed from the club!")
@@ -34,7 +34,7 @@ def kickout_member(request, club_id, user_id):
 @club_owner_required
 def demote_officer(request, club_id, user_id):
     """View that demote an officer to a member"""
-    club = Club.objects.get(id = club_id)
+    club = request.memberships.get(club_id).club_membership
     officer_to_demote = User.objects.get(id = user_id)
     Member.demoteOfficer(officer_to_demote, club)
     messages.add_message(request, messages.SUCCESS, "Officer was demoted!")
@@ -45,7 +45,7 @@ def demote_officer(request, club_id, user_id):
 @staff_required
 def accept_application(request, club_id, user_id):
     """View that accept an applicant and make member"""
-    club = Club.objects.get(id = club_id)
+    club = request.memberships.get(club_id).club_membership
     user = User.objects.get(id = user_id)
     Member.acceptApplicant(user, club)
     messages.add_message(request, messages.SUCCESS, "Application accepted!")
@@ -57,7 +57,7 @@ def accept_application(request, club_id, user_id):
 @staff_required
 def decline_application(request, club_id, user_id):
     """View that declines an applicant"""
-    club = Club.objects.get(id = club_id)
+    club = request.memberships.get(club_id).club_membership
     user = User.objects.get(id = user_id)
     Member.decline_application(user, club)
     messages.add_message(request, messages.WARNING, "Application declined!")
@@ -68,10 +68,12 @@ def decline_application(request, club_id, user_id):
 @club_owner_required
 def make_owner(request, club_id, user_id):
     """View that transfer ownership to other club member"""
-    club = Club.objects.get(id = club_id)
+    club = request.memberships.get(club_id).club_membership
     new_club_owner = User.objects.get(id = user_id)
     old_club_owner = request.user
-    Member.transferOwnership(new_club_owner, old_club_owner, club)
+    if not Member.transferOwnership(new_club_owner, old_club_owner, club):
+        messages.add_message(request, messages.ERROR, "Ownership can only be given to an officer of the club!")
+        return redirect('manage_officers', club_id)
     messages.add_message(request, messages.SUCCESS, "Club ownership was reassigned!")
     return redirect('show_club', club_id)
 
@@ -81,12 +83,49 @@ def apply_club(request, club_id):
     user = request.user
     try:
         club = Club.objects.get(id=club_id)
-        Member.objects.get(current_user=user, club_membership=club)
-        messages.add_message(request, messages.ERROR, f"You're already a member of { club.name }!!")
     except Club.DoesNotExist:
-        pass
-    except ObjectDoesNotExist:
-        Member.applyClub(user, club)
+        return redirect('feed')
+    if Member.applyClub(user, club):
         messages.add_message(request, messages.SUCCESS, f"You just applied to { club.name }!!")
-    finally:
-        return redirect('feed')
\ No newline at end of file
+    else:
+        messages.add_message(request, messages.ERROR, f"You're already a member of { club.name }!!")
+    return redirect('feed')
+
+@login_required
+@require_POST
+@staff_required
+def bulk_manage_applicants(request, club_id):
+    """View that accepts or declines all selected applicants at once"""
+    club = request.memberships.get(club_id).club_membership
+    user_ids = _selected_user_ids(request)
+    action = request.POST.get('action')
+    if action == 'accept':
+        accepted = Member.acceptApplicants(user_ids, club)
+        messages.add_message(request, messages.SUCCESS, f"{accepted} application(s) accepted!")
+    elif action == 'decline':
+        declined = Member.declineApplications(user_ids, club)
+        messages.add_message(request, messages.WARNING, f"{declined} application(s) declined!")
+    return redirect('manage_applicants', club_id)
+
+@login_required
+@require_POST
+@club_owner_required
+def bulk_manage_members(request, club_id):
+    """View that promotes, demotes or kicks out all selected members at once"""
+    club = request.memberships.get(club_id).club_membership
+    user_ids = _selected_user_ids(request)
+    action = request.POST.get('action')
+    if action == 'promote':
+        promoted = Member.promoteMembers(user_ids, club)
+        messages.add_message(request, messages.SUCCESS, f"{promoted} member(s) promoted!")
+    elif action == 'demote':
+        demoted = Member.demoteOfficers(user_ids, club)
+        messages.add_message(request, messages.SUCCESS, f"{demoted} officer(s) demoted!")
+    elif action == 'kick':
+        removed = Member.kickOutMembers(user_ids, club)
+        messages.add_message(request, messages.SUCCESS, f"{removed} member(s) removed from the club!")
+    return redirect('club_members', club_id)
+
+def _selected_user_ids(request):
+    """Return the ids of the users ticked in a bulk action form"""
+    return [int(user_id) for user_id in request.POST.getlist('user_ids') if user_id.isdigit()]
@@ -1,6 +1,7 @@
 """View mixins."""
 from django.shortcuts import redirect
 from django.core.exceptions import ImproperlyConfigured
+from clubs.pagination import CachedCountPaginator, KeysetPaginator, keyset_page
 
 class LoginProhibitedMixin:
     """Mixin that redirects when a user is logged in."""
@@ -27,3 +28,57 @@ class LoginProhibitedMixin:
             )
         else:
             return self.redirect_when_logged_in_url
+
+
+class KeysetPaginationMixin:
+    """Mixin that paginates a ListView by cursor instead of page number.
+
+    Pages are requested with ?after=<pk> or ?before=<pk>, or whichever
+    parameter names the view configures. Requests that still carry a page
+    number are paginated by number as before.
+    """
+
+    keyset_ordering = ('id',)
+    # Annotations of the queryset that equal the primary key
+    keyset_pk_aliases = ()
+    keyset_next_param = 'after'
+    keyset_previous_param = 'before'
+    keyset_last_param = None
+
+    def paginate_queryset(self, queryset, page_size):
+        """Paginate the queryset by keyset unless a page number was requested."""
+        if self.page_kwarg in self.kwargs or self.page_kwarg in self.request.GET:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering, pk_aliases=self.keyset_pk_aliases)
+        page = keyset_page(
+            paginator,
+            self.request.GET,
+            next_param=self.keyset_next_param,
+            previous_param=self.keyset_previous_param,
+            last_param=self.keyset_last_param,
+        )
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class CachedCountMixin:
+    """Mixin that paginates a ListView with counts cached by CachedCountPaginator."""
+
+    count_kind = None
+    count_tables = ()
+
+    def get_count_scope(self):
+        """Return what distinguishes this view's count from other counts of the same kind."""
+        return 'all'
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        """Return a paginator whose count is cached."""
+        return CachedCountPaginator(
+            queryset,
+            per_page,
+            count_kind=self.count_kind,
+            count_scope=self.get_count_scope(),
+            count_tables=self.count_tables,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            **kwargs
+        )
@@ -1,10 +1,17 @@
 """Post creation views."""
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import redirect, render
+from django.views.decorators.http import require_safe
 from clubs.forms import PostForm
-from clubs.models import Club,Post,Member
+from clubs.models import Post, TimelineEntry
 from clubs.helpers import club_owner_required
+from clubs.snapshots import club_posts
+from clubs.templatetags.post_rows import cached_post_rows
 from django.contrib.auth.mixins import LoginRequiredMixin
+from .feed_views import feed_posts
 from django.views.generic.edit import CreateView
 from django.utils.decorators import method_decorator
 
@@ -18,24 +25,48 @@ class PostMessagesView(LoginRequiredMixin, CreateView):
     @method_decorator(club_owner_required)
     def get(self,request,club_id):
     # get the post form. 
-        current_user = request.user
-        myClubs = Member.objects.filter(current_user = current_user)
         form = PostForm()
-        return render(request, 'post_messages.html', {'form': form,'club_id':club_id,'myclubs':myClubs})
+        return render(request, 'post_messages.html', {'form': form,'club_id':club_id})
     
     @method_decorator(club_owner_required)
     def post(self,request,club_id):
         # post the post form. 
         current_user = request.user
-        myClubs = Member.objects.filter(current_user = current_user)
-        club = Club.objects.get(id = club_id)
+        club = request.memberships.get(club_id).club_membership
         form = PostForm(request.POST)
         if form.is_valid():
             message = form.cleaned_data.get('message')
             post = Post.objects.create(author=current_user, message=message,club_own=club)
+            TimelineEntry.fanOut(post)
             messages.add_message(request, messages.SUCCESS, "Post was created!")
             return redirect('feed')
         else:
-            return render(request, 'post_messages.html', {'form': form,'club_id':club_id,'myclubs':myClubs})
+            return render(request, 'post_messages.html', {'form': form,'club_id':club_id})
+
 
+@login_required
+@require_safe
+def post_updates(request):
+    """View that returns the rows of posts newer than ?after=<post id>.
 
+    The posts are those of the user's feed, or of ?club=<club id>. Clients
+    ask again every POST_UPDATES_INTERVAL seconds; the request is answered at
+    once, so it never holds a worker. has_more tells the client that there
+    were more new posts than fit on a page, so it should reload.
+    """
+    try:
+        after_id = int(request.GET.get('after', 0))
+        club_id = int(request.GET['club']) if 'club' in request.GET else None
+    except ValueError:
+        return HttpResponseBadRequest()
+    if club_id is None:
+        posts = feed_posts(request.user).filter(feed_id__gt=after_id)
+    else:
+        posts = club_posts(club_id).filter(id__gt=after_id)
+    posts_per_page = settings.POSTS_PER_PAGE
+    new_posts = list(posts[:posts_per_page + 1])
+    return JsonResponse({
+        'rows': cached_post_rows(new_posts[:posts_per_page]),
+        'last_id': new_posts[0].id if new_posts else after_id,
+        'has_more': len(new_posts) > posts_per_page,
+    })
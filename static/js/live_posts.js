@@ -0,0 +1,41 @@
+// Asks every few seconds for posts newer than the ones in #live-posts and adds their rows to the top of its table.
+// Each request is answered at once, so polling never holds a server worker.
+(function () {
+  function poll(container) {
+    var url = container.dataset.url + '?after=' + encodeURIComponent(container.dataset.after);
+    fetch(url, { credentials: 'same-origin', headers: { 'Accept': 'application/json' } })
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error('Post updates failed with status ' + response.status);
+        }
+        return response.json();
+      })
+      .then(function (updates) {
+        if (updates.has_more) {
+          window.location.reload();
+          return;
+        }
+        if (updates.rows) {
+          var table = container.querySelector('table');
+          (table.tBodies[0] || table).insertAdjacentHTML('afterbegin', updates.rows);
+          if (window.showRelativeTimes) {
+            window.showRelativeTimes(container);
+          }
+        }
+        container.dataset.after = updates.last_id;
+      })
+      .catch(function () {})
+      .then(function () { schedule(container); });
+  }
+
+  function schedule(container) {
+    setTimeout(function () { poll(container); }, Number(container.dataset.interval) * 1000);
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    var container = document.getElementById('live-posts');
+    if (container) {
+      schedule(container);
+    }
+  });
+})();
@@ -0,0 +1,25 @@
+// Shows the <time class="relative-time"> elements relative to now, e.g. "5 minutes ago".
+// Done in the browser so that the server can cache the HTML around them.
+(function () {
+  var units = [
+    ['year', 31536000], ['month', 2592000], ['week', 604800], ['day', 86400],
+    ['hour', 3600], ['minute', 60], ['second', 1]
+  ];
+  var format = new Intl.RelativeTimeFormat(undefined, { numeric: 'auto' });
+
+  function showRelativeTimes(root) {
+    (root || document).querySelectorAll('time.relative-time').forEach(function (element) {
+      var seconds = (new Date(element.getAttribute('datetime')) - Date.now()) / 1000;
+      for (var index = 0; index < units.length; index++) {
+        var unit = units[index];
+        if (Math.abs(seconds) >= unit[1] || unit[0] === 'second') {
+          element.textContent = format.format(Math.round(seconds / unit[1]), unit[0]);
+          break;
+        }
+      }
+    });
+  }
+
+  window.showRelativeTimes = showRelativeTimes;
+  document.addEventListener('DOMContentLoaded', function () { showRelativeTimes(); });
+})();
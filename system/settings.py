@@ -56,6 +56,8 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'clubs.middleware.CacheVersionsMiddleware',
+    'clubs.middleware.MembershipMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -73,6 +75,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'clubs.context_processors.myclubs',
             ],
         },
     },
@@ -92,6 +95,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+# Cached versions must be the same in every worker process, or invalidating them in
+# one would leave the others serving stale pages, so wherever more than one process
+# serves requests MEMCACHED_LOCATION must name the memcached servers. Without it the
+# cache is local to the process, which only suits the development server.
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.environ['MEMCACHED_LOCATION'].split(','),
+            # An unreachable memcached makes every lookup a miss rather than an error
+            'OPTIONS': {'no_delay': True, 'ignore_exc': True},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Runs the tests against a local memory cache emptied after every test
+TEST_RUNNER = 'clubs.tests.runner.LocMemCacheTestRunner'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -141,11 +172,42 @@ REDIRECT_URL_WHEN_NOT_LOGGED_IN = 'home'
 # URL where @club_owner_required redirects to
 REDIRECT_WHEN_NOT_CLUB_OWNER = 'feed'
 
+
+# Serve feeds from the per-user timeline table, filled in when posts are created.
+# Run the backfill_timeline command after switching this on.
+MATERIALIZED_FEED = False
+
+# Seconds a club page snapshot is kept for. Changes replace the versions it is stored under,
+# so this only bounds how long unused snapshots take up the cache.
+CLUB_SNAPSHOT_TIMEOUT = 60 * 5
+
+# Seconds the content of a club page rendered for one role tier is kept for
+CLUB_FRAGMENT_TIMEOUT = 60 * 5
+
+# Seconds the feed waits between asking for new posts
+POST_UPDATES_INTERVAL = 15
+
+# Seconds a rendered post row is kept for. Rows are keyed by the versions of their
+# author's profile and club, so this only bounds how long unused rows take space.
+POST_ROW_TIMEOUT = 60 * 60 * 24
+
+# Where avatars come from: 'gravatar' links to Gravatar, 'identicon' draws them
+# locally, stores them in AVATAR_ROOT and serves them from there
+AVATAR_MODE = 'gravatar'
+AVATAR_ROOT = os.path.join(BASE_DIR, 'avatars')
+AVATAR_SIZES = (60, 120)
+
 # For pagination
 MEMBERS_PER_PAGE = 10
 CLUBS_PER_PAGE = 10
 POSTS_PER_PAGE = 10
 
+# Seconds a paginator's object count is cached for
+PAGINATOR_COUNT_TIMEOUT = 30
+
+# Unfiltered tables with more rows than this are counted from the database's statistics
+PAGINATOR_ESTIMATE_THRESHOLD = 100000
+
 # For @login_required decorator
 LOGIN_URL = 'home'
 
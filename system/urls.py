@@ -14,7 +14,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from clubs import views
 
 urlpatterns = [
@@ -31,9 +31,10 @@ urlpatterns = [
     path('sign_up/', views.SignUpView.as_view(), name='sign_up'),
     path('log_out/', views.log_out, name='log_out'),
     path('feed/', views.FeedView.as_view(), name='feed'),
+    path('posts/updates/', views.post_updates, name='post_updates'),
     path('members/', views.MemberListView.as_view(), name='member_list'),
     path('clubs/', views.ClubListView.as_view(), name='club_list'),
-    path('apply/', views.apply, name='apply'),
+    path('apply/', views.ApplyView.as_view(), name='apply'),
     path('create_club/', views.create_club, name='create_club'),
     path('members/<int:club_id>', views.club_members, name='club_members'),
     path('manage_officers/<int:club_id>', views.manage_officers, name='manage_officers'),
@@ -43,8 +44,11 @@ urlpatterns = [
     path('demote_officer/<int:club_id>/<int:user_id>', views.demote_officer, name='demote_officer'),
     path('accept_application/<int:club_id>/<int:user_id>', views.accept_application, name='accept_application'),
     path('decline_application/<int:club_id>/<int:user_id>', views.decline_application, name='decline_application'),
+    path('bulk_manage_applicants/<int:club_id>', views.bulk_manage_applicants, name='bulk_manage_applicants'),
+    path('bulk_manage_members/<int:club_id>', views.bulk_manage_members, name='bulk_manage_members'),
     path('make_owner/<int:club_id>/<int:user_id>', views.make_owner , name='make_owner'),
     path('club_member/<int:club_id>/<int:user_id>', views.club_member, name='club_member'),
     path('apply_club/<int:club_id>', views.apply_club, name='apply_club'),
+    re_path(r'^avatars/(?P<avatar_hash>[0-9a-f]{32})/(?P<size>[0-9]+)\.svg$', views.avatar, name='avatar'),
     path('post_messages/<int:club_id>', views.PostMessagesView.as_view(),name='post_messages'),
 ]